@@ -1,9 +1,11 @@
 import requests
 import logging
-import smtplib
 import time
 import os
-from email.mime.text import MIMEText
+import json
+
+# Encoded '{"content": "[service] ' payload prefixes for Discord, per service name
+_discord_prefix_cache = {}
 
 def human_error_message(e, context=""):
     """
@@ -108,6 +110,19 @@ def notify_ntfy(url, message, service_name=None):
         except ImportError:
             pass
 
+def _discord_payload(message, service_name=None):
+    """
+    Returns the encoded JSON body for a Discord webhook call.
+    The static prefix is encoded once per service name; only the message
+    itself is escaped on each call.
+    """
+    prefix = _discord_prefix_cache.get(service_name)
+    if prefix is None:
+        label = f"[{service_name}] " if service_name else ""
+        prefix = ('{"content": "' + json.dumps(label)[1:-1]).encode("utf-8")
+        _discord_prefix_cache[service_name] = prefix
+    return prefix + json.dumps(message)[1:-1].encode("utf-8") + b'"}'
+
 def notify_discord(webhook_url, message, service_name=None):
     """
     Sends a notification via Discord webhook.
@@ -120,9 +135,8 @@ def notify_discord(webhook_url, message, service_name=None):
         except ImportError:
             pass
             
-        msg = f"[{service_name}] {message}" if service_name else message
-        data = {"content": msg}
-        response = requests.post(webhook_url, json=data, timeout=5)
+        data = _discord_payload(message, service_name)
+        response = requests.post(webhook_url, data=data, headers={"Content-Type": "application/json"}, timeout=5)
         
         try:
             from update_dyndns import log
@@ -233,6 +247,10 @@ def notify_email(cfg, subject, message, service_name=None):
     """
     Sends an email notification using the provided SMTP configuration.
     """
+    # Only needed for email notifications, so import on first use
+    import smtplib
+    from email.mime.text import MIMEText
+
     try:
         # Import log function for debug info
         try:
@@ -308,10 +326,11 @@ def send_notifications(config, level, message, subject=None, service_name=None):
     try:
         from update_dyndns import log
     except ImportError:
-        # Fallback if running standalone
-        import datetime
+        # Fallback if running standalone (UTC, same format as update_dyndns.log)
         def log(msg, lv="INFO", section="NOTIFY"):
-            print(f"{datetime.datetime.now().isoformat()} [{lv}] {section} --> {msg}")
+            now = time.time()
+            stamp = f"{time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(now))}.{int(now % 1 * 1_000_000):06d}+00:00"
+            print(f"{stamp} [{lv}] {section} --> {msg}")
     
     # Debug: Overall notification call
     log(f"=== NOTIFICATION DEBUG START ===", "DEBUG", "NOTIFY")
@@ -0,0 +1,97 @@
+import os
+import sys
+from types import MappingProxyType
+
+import pytest
+
+# Projektwurzel einmalig in den Importpfad, damit die Testmodule update_dyndns direkt importieren können
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    """Benchmarks laufen nur mit --benchmark-only; ohne pytest-benchmark werden sie übersprungen."""
+    if config.pluginmanager.hasplugin("benchmark"):
+        # Vor der BenchmarkSession des Plugins setzen; --benchmark-only hat Vorrang
+        config.option.benchmark_skip = True
+    else:
+        config.addinivalue_line("markers", "benchmark: benötigt pytest-benchmark")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.pluginmanager.hasplugin("benchmark"):
+        return
+    skip_benchmark = pytest.mark.skip(reason="pytest-benchmark ist nicht installiert")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip_benchmark)
+
+
+@pytest.fixture(autouse=True, scope="module")
+def clear_prepared_providers():
+    """Von prepare_providers() vorbereitete Instanzen gehören nur zum jeweiligen Testmodul."""
+    import update_dyndns
+    update_dyndns._PREPARED_PROVIDERS = {}
+    yield
+    update_dyndns._PREPARED_PROVIDERS = {}
+
+
+@pytest.fixture(autouse=True)
+def reset_state():
+    """Setzt den globalen State vor und nach jedem Test zurück (xdist-Worker teilen ihn)."""
+    from update_dyndns import state
+    snapshot = (state.log_level, state.console_level, state.last_ipv4, state.last_ipv6)
+    state.reset_network_state()
+    yield
+    state.log_level, state.console_level, state.last_ipv4, state.last_ipv6 = snapshot
+    state.reset_network_state()
+
+
+@pytest.fixture(autouse=True)
+def clear_cloudflare_cache(tmp_path, monkeypatch):
+    """Gecachte Cloudflare Zone-/Record-IDs dürfen nicht in andere Tests durchsickern."""
+    from update_dyndns import _invalidate_cloudflare_ids
+    # Persistierte Zone-IDs pro Test in ein eigenes Verzeichnis (xdist-Worker teilen /tmp)
+    monkeypatch.setattr("update_dyndns.CF_ZONE_CACHE_DIR", str(tmp_path))
+    _invalidate_cloudflare_ids()
+    yield
+    _invalidate_cloudflare_ids()
+
+
+# Vorgefertigte, gültige Provider für Tests, die die Instanz nur lesen.
+# Tests mit Fehlerinjektion oder Mutationen erzeugen weiterhin eigene Instanzen.
+
+@pytest.fixture(scope="module")
+def cloudflare_provider():
+    from update_dyndns import create_provider
+    return create_provider(MappingProxyType({
+        'type': 'cloudflare',
+        'name': 'test-cloudflare',
+        'api_token': 'test_token',
+        'zone': 'example.com',
+        'record_name': 'test.example.com'
+    }))
+
+
+@pytest.fixture(scope="module")
+def ipv64_provider():
+    from update_dyndns import create_provider
+    return create_provider(MappingProxyType({
+        'type': 'ipv64',
+        'name': 'test-ipv64',
+        'token': 'test_token',
+        'domain': 'test.example.com'
+    }))
+
+
+@pytest.fixture(scope="module")
+def dyndns2_provider():
+    from update_dyndns import create_provider
+    return create_provider(MappingProxyType({
+        'type': 'dyndns2',
+        'name': 'test-dyndns2',
+        'url': 'https://test.example.com/nic/update',
+        'hostname': 'test.example.com',
+        'username': 'testuser',
+        'password': 'testpass'
+    }))
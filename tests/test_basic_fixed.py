@@ -6,6 +6,7 @@ These tests focus on core functionality without network/file operations.
 
 import unittest
 import os
+import json
 import sys
 from unittest.mock import patch, MagicMock, mock_open
 from pathlib import Path
@@ -92,15 +93,15 @@ class TestLogging(unittest.TestCase):
         self.assertTrue(update_dyndns.should_log("ERROR", "WARNING"))
         self.assertFalse(update_dyndns.should_log("WARNING", "ERROR"))
     
-    @patch('builtins.print')
-    def test_log_function_basic(self, mock_print):
+    @patch('sys.stdout')
+    def test_log_function_basic(self, mock_stdout):
         """Test basic log function."""
         with patch('update_dyndns.file_logger_instance', None):
             update_dyndns.log("Test message", "INFO", "TEST")
-            mock_print.assert_called_once()
+            mock_stdout.write.assert_called_once()
             
             # Verify the message format
-            call_args = mock_print.call_args[0][0]
+            call_args = mock_stdout.write.call_args[0][0]
             self.assertIn("[INFO] TEST --> Test message", call_args)
 
 
@@ -256,7 +257,7 @@ class TestProviderUpdates(unittest.TestCase):
         provider2 = update_dyndns.create_provider(config_token)
         self.assertIsInstance(provider2, update_dyndns.CloudflareProvider)
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     @patch('update_dyndns.log')
     def test_update_dyndns2_success(self, mock_log, mock_get):
         """Test successful DynDNS2 update."""
@@ -276,7 +277,7 @@ class TestProviderUpdates(unittest.TestCase):
         result = update_dyndns.update_dyndns2(provider, "192.168.1.1")
         self.assertEqual(result, "updated")
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     @patch('update_dyndns.log')
     def test_update_dyndns2_nochg(self, mock_log, mock_get):
         """Test DynDNS2 no change response."""
@@ -296,7 +297,7 @@ class TestProviderUpdates(unittest.TestCase):
         result = update_dyndns.update_dyndns2(provider, "192.168.1.1")
         self.assertEqual(result, "nochg")
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     @patch('update_dyndns.log')
     def test_update_dyndns2_error(self, mock_log, mock_get):
         """Test DynDNS2 error response."""
@@ -320,20 +321,21 @@ class TestProviderUpdates(unittest.TestCase):
 class TestIPService(unittest.TestCase):
     """Tests for IP service functionality."""
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     @patch('update_dyndns.log')
     def test_get_public_ip_success(self, mock_log, mock_get):
         """Test successful public IP retrieval."""
         mock_response = MagicMock()
         mock_response.text = "192.168.1.1\n"
+        mock_response.headers = {}
         mock_response.raise_for_status.return_value = None
         mock_get.return_value = mock_response
         
         result = update_dyndns.get_public_ip("https://example.com/ip")
         self.assertEqual(result, "192.168.1.1")
-        mock_get.assert_called_once_with("https://example.com/ip", timeout=10)
+        mock_get.assert_called_once_with("https://example.com/ip", timeout=update_dyndns.IP_SERVICE_TIMEOUT)
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     @patch('update_dyndns.log')
     def test_get_public_ip_invalid_format(self, mock_log, mock_get):
         """Test handling of invalid IP format."""
@@ -345,7 +347,7 @@ class TestIPService(unittest.TestCase):
         result = update_dyndns.get_public_ip("https://example.com/ip")
         self.assertIsNone(result)
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     @patch('update_dyndns.log')
     def test_get_public_ip_connection_error(self, mock_log, mock_get):
         """Test handling of connection errors."""
@@ -379,13 +381,13 @@ class TestNotifications(unittest.TestCase):
         mock_post.assert_called_once()
         args, kwargs = mock_post.call_args
         self.assertEqual(args[0], webhook_url)
-        self.assertEqual(kwargs.get("json", {}).get("content"), "[TestService] Test message")
+        self.assertEqual(json.loads(kwargs["data"])["content"], "[TestService] Test message")
 
 
 class TestAuthenticationMethods(unittest.TestCase):
     """Tests for different authentication methods."""
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     @patch('update_dyndns.log')
     def test_dyndns2_token_auth(self, mock_log, mock_get):
         """Test DynDNS2 with token authentication."""
@@ -408,7 +410,7 @@ class TestAuthenticationMethods(unittest.TestCase):
         args, kwargs = mock_get.call_args
         self.assertEqual(kwargs.get("params", {}).get("token"), "test-token")
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     @patch('update_dyndns.log')
     def test_dyndns2_bearer_auth(self, mock_log, mock_get):
         """Test DynDNS2 with bearer authentication."""
@@ -145,33 +145,34 @@ class TestProviderArchitecture(unittest.TestCase):
         ]
         
         for protocol_name, expected_class in test_cases:
-            config = {
-                'protocol': protocol_name,
-                'name': f'test-{protocol_name.lower()}',
-                'zone': 'example.com',
-                'api_token': 'test_token',
-                'record_name': 'sub.example.com'
-            }
+            with self.subTest(protocol=protocol_name):
+                config = {
+                    'protocol': protocol_name,
+                    'name': f'test-{protocol_name.lower()}',
+                    'zone': 'example.com',
+                    'api_token': 'test_token',
+                    'record_name': 'sub.example.com'
+                }
             
-            if 'ipv64' in protocol_name.lower():
-                config.update({'token': 'test_token', 'domain': 'example.com'})
-                config.pop('zone', None)
-                config.pop('api_token', None)
-                config.pop('record_name', None)
-            elif 'dyndns2' in protocol_name.lower():
-                config.update({
-                    'url': 'https://updates.example.org/api/',
-                    'hostname': 'test.example.com',
-                    'auth_method': 'token',
-                    'token': 'test_token'
-                })
-                config.pop('zone', None)
-                config.pop('api_token', None)
-                config.pop('record_name', None)
+                if 'ipv64' in protocol_name.lower():
+                    config.update({'token': 'test_token', 'domain': 'example.com'})
+                    config.pop('zone', None)
+                    config.pop('api_token', None)
+                    config.pop('record_name', None)
+                elif 'dyndns2' in protocol_name.lower():
+                    config.update({
+                        'url': 'https://updates.example.org/api/',
+                        'hostname': 'test.example.com',
+                        'auth_method': 'token',
+                        'token': 'test_token'
+                    })
+                    config.pop('zone', None)
+                    config.pop('api_token', None)
+                    config.pop('record_name', None)
             
-            provider = create_provider(config)
-            self.assertIsInstance(provider, expected_class)
-            print(f"  ✅ {protocol_name} -> {expected_class.__name__}")
+                provider = create_provider(config)
+                self.assertIsInstance(provider, expected_class)
+                print(f"  ✅ {protocol_name} -> {expected_class.__name__}")
     
     def test_config_validation(self):
         """Test configuration validation for all providers."""
@@ -9,6 +9,8 @@ import requests
 import socket
 import os
 import json
+import threading
+import time
 from unittest.mock import patch, MagicMock, mock_open
 
 # Import your modules - adjust imports as needed
@@ -18,20 +20,55 @@ import notify
 
 # Tests for IP-related functions
 class TestIPFunctions:
-    @patch('requests.get')
+    def test_get_session_is_shared(self):
+        # Test that one pooled session with retrying adapters is reused
+        session = update_dyndns.get_session()
+        assert update_dyndns.get_session() is session
+        adapter = session.get_adapter("https://api.cloudflare.com/")
+        assert adapter.max_retries.total == 3
+        assert 503 in adapter.max_retries.status_forcelist
+
+    @patch('requests.Session.get')
     def test_get_public_ip(self, mock_get):
         # Setup mock
         mock_response = MagicMock()
         mock_response.text = "192.168.1.1\n"
+        mock_response.headers = {}
         mock_response.raise_for_status.return_value = None
         mock_get.return_value = mock_response
         
         # Call function and test
         result = update_dyndns.get_public_ip("https://example.com/ip")
         assert result == "192.168.1.1"
-        mock_get.assert_called_once_with("https://example.com/ip", timeout=10)
+        mock_get.assert_called_once_with("https://example.com/ip", timeout=update_dyndns.IP_SERVICE_TIMEOUT)
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
+    def test_get_public_ipv6_returns_canonical_form(self, mock_get):
+        # Test that equivalent IPv6 spellings map to one string, so they never count as a change
+        mock_response = MagicMock()
+        mock_response.text = "2001:0DB8:0000:0000::1\n"
+        mock_response.headers = {}
+        mock_get.return_value = mock_response
+
+        assert update_dyndns.get_public_ipv6("https://example.com/ip6") == "2001:db8::1"
+        assert update_dyndns.canonical_ip("not-an-ip") == "not-an-ip"
+
+    @patch('requests.Session.get')
+    def test_get_public_ip_revalidates_with_etag(self, mock_get):
+        # Test that a 304 answer reuses the last IP and the validators are sent back
+        first = MagicMock(status_code=200, text="203.0.113.7", headers={"ETag": '"v1"'})
+        not_modified = MagicMock(status_code=304, text="", headers={})
+        mock_get.side_effect = [first, not_modified]
+        url = "https://etag.example.com/ip"
+        try:
+            assert update_dyndns.get_public_ip(url) == "203.0.113.7"
+            assert update_dyndns.get_public_ip(url) == "203.0.113.7"
+            assert mock_get.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+            not_modified.raise_for_status.assert_not_called()
+        finally:
+            update_dyndns._IP_SERVICE_VALIDATORS.pop(url, None)
+
+    @patch('requests.Session.get')
     def test_get_public_ip_invalid_ip(self, mock_get):
         # Test when service returns invalid IP format
         mock_response = MagicMock()
@@ -43,7 +80,7 @@ class TestIPFunctions:
             result = update_dyndns.get_public_ip("https://example.com/ip")
             assert result is None
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_get_public_ip_error(self, mock_get):
         # Test error handling
         mock_get.side_effect = requests.exceptions.RequestException("Connection error")
@@ -75,7 +112,7 @@ class TestIPFunctions:
 
 # Tests for update functions
 class TestUpdateFunctions:
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_update_dyndns2_success(self, mock_get):
         # Setup mock
         mock_response = MagicMock()
@@ -97,7 +134,7 @@ class TestUpdateFunctions:
             result = update_dyndns.update_dyndns2(provider, "192.168.1.1")
             assert result == "updated"
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_update_dyndns2_nochg(self, mock_get):
         # Test nochg response
         mock_response = MagicMock()
@@ -117,7 +154,7 @@ class TestUpdateFunctions:
             result = update_dyndns.update_dyndns2(provider, "192.168.1.1")
             assert result == "nochg"
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_update_dyndns2_with_extra_params(self, mock_get):
         # Test extra_params
         mock_response = MagicMock()
@@ -157,7 +194,7 @@ class TestNotifications:
             # Verify Discord webhook was called with right data
             args, kwargs = mock_post.call_args
             assert args[0] == webhook_url
-            assert kwargs.get("json", {}).get("content") == "[TestService] Test message"
+            assert json.loads(kwargs["data"])["content"] == "[TestService] Test message"
     
     @patch('smtplib.SMTP')
     def test_notify_email(self, mock_smtp):
@@ -225,6 +262,13 @@ class TestConfiguration:
         with patch('update_dyndns.log'):
             assert update_dyndns.validate_config(invalid_config) is False
 
+    def test_get_ip_sources(self):
+        # Test that the first list entry is used when only the plural form is configured
+        config = {"ip_services": ["https://a.example", "https://b.example"], "interface6": "eth0"}
+        assert update_dyndns.get_ip_sources(config) == ("https://a.example", None, None, "eth0")
+        config = {"ip_service": "https://v4.example", "ip6_services": ["https://v6.example"], "interface": "eth1"}
+        assert update_dyndns.get_ip_sources(config) == ("https://v4.example", "eth1", "https://v6.example", None)
+
 # Test für den Fall, dass keine Benachrichtigungskonfiguration vorhanden ist
 def test_send_notifications_with_no_config():
     # Sollte ohne Fehler beendet werden
@@ -335,22 +379,26 @@ class TestInterfaceFunctions:
             result = update_dyndns.get_interface_ipv4("eth0")
             assert result == "192.168.1.100"
     
-    @patch('builtins.open', mock_open())
-    @patch('update_dyndns.socket.getaddrinfo')
-    def test_get_interface_ipv6_success(self, mock_getaddrinfo):
-        # Mock IPv6 address info
-        mock_getaddrinfo.return_value = [
-            (socket.AF_INET6, None, None, None, ("2001:db8::1", 0, 0, 0))
-        ]
-        
-        with patch('update_dyndns.validate_ipv6', return_value=True), \
-             patch('update_dyndns.log'):
+    @patch('update_dyndns._open', mock_open(read_data=(
+        "fe800000000000000000000000000001 02 40 20 80     eth0\n"
+        "20010db8000000000000000000000001 02 40 00 80     eth0\n"
+        "20010db8000000000000000000000002 03 40 00 80     wlan0\n"
+    )))
+    def test_get_interface_ipv6_success(self):
+        # Test that the first global address of the interface is taken from /proc/net/if_inet6
+        with patch('update_dyndns.log'):
             result = update_dyndns.get_interface_ipv6("eth0")
             assert result == "2001:db8::1"
 
+    @patch('update_dyndns._open', mock_open(read_data="20010db8000000000000000000000002 03 40 00 80 wlan0\n"))
+    def test_get_interface_ipv6_unknown_interface(self):
+        # Test that an interface missing from /proc/net/if_inet6 yields None
+        with patch('update_dyndns.log'):
+            assert update_dyndns.get_interface_ipv6("eth0") is None
+
 # Tests for provider-specific updates
 class TestProviderUpdates:
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_update_cloudflare_success(self, mock_get):
         # Test successful Cloudflare update
         # Mock zone ID response
@@ -364,7 +412,7 @@ class TestProviderUpdates:
         record_response = MagicMock()
         record_response.json.return_value = {
             "success": True,
-            "result": [{"id": "record123", "content": "1.2.3.4"}]
+            "result": [{"id": "record123", "type": "A", "content": "1.2.3.4"}]
         }
         
         # Mock update response
@@ -379,12 +427,220 @@ class TestProviderUpdates:
             "record_name": "test.example.com"
         }
         
-        with patch('requests.patch', return_value=update_response), \
+        with patch('requests.Session.patch', return_value=update_response), \
              patch('update_dyndns.log'):
             result = update_dyndns.update_cloudflare(provider, "1.2.3.5")
             assert result == "updated"
-    
-    @patch('requests.get')
+
+    @patch('requests.Session.get')
+    def test_update_cloudflare_dual_stack_single_lookup(self, mock_get):
+        # Test that A and AAAA records are fetched with one list query
+        zone_response = MagicMock()
+        zone_response.json.return_value = {"success": True, "result": [{"id": "zone123"}]}
+        records_response = MagicMock()
+        records_response.json.return_value = {
+            "success": True,
+            "result": [
+                {"id": "rec-a", "type": "A", "content": "1.2.3.4"},
+                {"id": "rec-aaaa", "type": "AAAA", "content": "2001:db8::1"},
+            ]
+        }
+        mock_get.side_effect = [zone_response, records_response]
+        provider = {"api_token": "test-token", "zone": "example.com", "record_name": "test.example.com"}
+
+        with patch('requests.Session.patch', return_value=MagicMock(ok=True)) as mock_patch, \
+             patch('update_dyndns.log'):
+            result = update_dyndns.update_cloudflare(provider, "1.2.3.4", "2001:db8::2")
+
+        assert result == "updated"
+        assert mock_get.call_count == 2
+        assert "type=" not in mock_get.call_args_list[1].args[0]
+        mock_patch.assert_called_once()
+        assert mock_patch.call_args.args[0].endswith("/dns_records/rec-aaaa")
+        assert mock_patch.call_args.kwargs["json"]["type"] == "AAAA"
+
+    @patch('requests.Session.get')
+    def test_update_cloudflare_dual_stack_patches_both(self, mock_get):
+        # Test that changed A and AAAA records are both patched
+        zone_response = MagicMock()
+        zone_response.json.return_value = {"success": True, "result": [{"id": "zone123"}]}
+        records_response = MagicMock()
+        records_response.json.return_value = {
+            "success": True,
+            "result": [
+                {"id": "rec-a", "type": "A", "content": "1.2.3.4"},
+                {"id": "rec-aaaa", "type": "AAAA", "content": "2001:db8::1"},
+            ]
+        }
+        mock_get.side_effect = [zone_response, records_response]
+        provider = {"api_token": "test-token", "zone": "example.com", "record_name": "test.example.com"}
+
+        with patch('requests.Session.patch', return_value=MagicMock(ok=True)) as mock_patch, \
+             patch('update_dyndns.log'):
+            result = update_dyndns.update_cloudflare(provider, "1.2.3.5", "2001:db8::2")
+
+        assert result == "updated"
+        patched = sorted(c.kwargs["json"]["type"] for c in mock_patch.call_args_list)
+        assert patched == ["A", "AAAA"]
+
+    @patch('requests.Session.get')
+    def test_update_cloudflare_caches_zone_id(self, mock_get):
+        # Test that the zone lookup happens once across runs and a stale record ID is looked up again
+        zone_response = MagicMock()
+        zone_response.json.return_value = {"success": True, "result": [{"id": "zone123"}]}
+        record_response = MagicMock()
+        record_response.json.return_value = {
+            "success": True,
+            "result": [{"id": "record123", "type": "A", "content": "1.2.3.4"}]
+        }
+        mock_get.side_effect = [zone_response, record_response, zone_response, record_response, zone_response]
+
+        provider = {
+            "api_token": "test-token",
+            "zone": "example.com",
+            "record_name": "test.example.com"
+        }
+        not_found = MagicMock(ok=False, status_code=404)
+
+        with patch('requests.Session.patch', return_value=not_found) as mock_patch, \
+             patch('update_dyndns.log'):
+            assert update_dyndns.update_cloudflare(provider, "1.2.3.4") == "nochg"
+            # The cached record ID answers 404: the records are listed again and the PATCH repeated
+            assert update_dyndns.update_cloudflare(provider, "1.2.3.5") is False
+            assert update_dyndns.get_cloudflare_zone_id.cache_info().currsize == 0
+            update_dyndns.get_cloudflare_zone_id("test-token", "example.com")
+
+        zone_calls = [c for c in mock_get.call_args_list if "zones?name=" in c.args[0]]
+        assert len(zone_calls) == 3
+        assert len(mock_get.call_args_list) - len(zone_calls) == 2
+        assert mock_patch.call_count == 2
+        assert not update_dyndns._CF_RECORD_IDS
+
+    @patch('requests.Session.get')
+    def test_cloudflare_zone_id_survives_restart(self, mock_get):
+        # Test that a zone ID is read back from disk after the in-memory cache is gone
+        zone_response = MagicMock()
+        zone_response.json.return_value = {"success": True, "result": [{"id": "zone123"}]}
+        mock_get.return_value = zone_response
+
+        assert update_dyndns.get_cloudflare_zone_id("test-token", "example.com") == "zone123"
+        update_dyndns.get_cloudflare_zone_id.cache_clear()
+        assert update_dyndns.get_cloudflare_zone_id("test-token", "example.com") == "zone123"
+        assert mock_get.call_count == 1
+
+        update_dyndns._invalidate_cloudflare_ids()
+        assert update_dyndns.get_cloudflare_zone_id("test-token", "example.com") == "zone123"
+        assert mock_get.call_count == 2
+
+    @patch('requests.Session.get')
+    def test_update_cloudflare_reuses_record_ids(self, mock_get):
+        # Test that a known record ID skips the list query on the next IP change
+        zone_response = MagicMock()
+        zone_response.json.return_value = {"success": True, "result": [{"id": "zone123"}]}
+        records_response = MagicMock()
+        records_response.json.return_value = {
+            "success": True,
+            "result": [{"id": "rec-a", "type": "A", "content": "1.2.3.4"}]
+        }
+        mock_get.side_effect = [zone_response, records_response]
+        provider = {"api_token": "test-token", "zone": "example.com", "record_name": "test.example.com"}
+
+        with patch('requests.Session.patch', return_value=MagicMock(ok=True)) as mock_patch, \
+             patch('update_dyndns.log'):
+            assert update_dyndns.update_cloudflare(provider, "1.2.3.5") == "updated"
+            assert update_dyndns.update_cloudflare(provider, "1.2.3.6") == "updated"
+            assert update_dyndns.update_cloudflare(provider, "1.2.3.6") == "nochg"
+
+        assert mock_get.call_count == 2
+        assert mock_patch.call_count == 2
+        assert mock_patch.call_args.args[0].endswith("/dns_records/rec-a")
+
+    @patch('requests.Session.get')
+    def test_update_cloudflare_cached_failed_patch_is_an_error(self, mock_get):
+        # Test that a failed PATCH on cached record IDs is not reported as "nochg"
+        zone_response = MagicMock()
+        zone_response.json.return_value = {"success": True, "result": [{"id": "zone123"}]}
+        records_response = MagicMock()
+        records_response.json.return_value = {
+            "success": True,
+            "result": [{"id": "rec-a", "type": "A", "content": "1.2.3.4"}]
+        }
+        mock_get.side_effect = [zone_response, records_response]
+        provider = {"api_token": "test-token", "zone": "example.com", "record_name": "test.example.com"}
+
+        with patch('requests.Session.patch', return_value=MagicMock(ok=False, status_code=500)), \
+             patch('update_dyndns.log'):
+            assert update_dyndns.update_cloudflare(provider, "1.2.3.4") == "nochg"
+            assert update_dyndns.update_cloudflare(provider, "1.2.3.5") is False
+
+    @patch('requests.Session.get')
+    def test_update_cloudflare_cached_patches_only_changed_type(self, mock_get):
+        # Test that with cached record IDs only the record whose IP changed is patched
+        zone_response = MagicMock()
+        zone_response.json.return_value = {"success": True, "result": [{"id": "zone123"}]}
+        records_response = MagicMock()
+        records_response.json.return_value = {
+            "success": True,
+            "result": [
+                {"id": "rec-a", "type": "A", "content": "1.2.3.4"},
+                {"id": "rec-aaaa", "type": "AAAA", "content": "2001:db8::1"},
+            ]
+        }
+        mock_get.side_effect = [zone_response, records_response]
+        provider = {"api_token": "test-token", "zone": "example.com", "record_name": "test.example.com"}
+
+        with patch('requests.Session.patch', return_value=MagicMock(ok=True)) as mock_patch, \
+             patch('update_dyndns.log'):
+            assert update_dyndns.update_cloudflare(provider, "1.2.3.5", "2001:db8::1") == "updated"
+            assert update_dyndns.update_cloudflare(provider, "1.2.3.6", "2001:db8::1") == "updated"
+
+        assert mock_get.call_count == 2
+        assert [c.kwargs["json"]["type"] for c in mock_patch.call_args_list] == ["A", "A"]
+
+    @patch('requests.Session.get')
+    def test_update_cloudflare_stale_disk_zone_id(self, mock_get):
+        # Test that a stale zone ID from the disk cache is looked up again once
+        cache_file = update_dyndns._cf_zone_cache_file("test-token", "example.com")
+        with open(cache_file, "w") as f:
+            f.write("oldzone")
+        stale_response = MagicMock(ok=False, status_code=403)
+        stale_response.json.return_value = {"success": False, "errors": [{"code": 7003}]}
+        zone_response = MagicMock()
+        zone_response.json.return_value = {"success": True, "result": [{"id": "newzone"}]}
+        records_response = MagicMock()
+        records_response.json.return_value = {
+            "success": True,
+            "result": [{"id": "rec123", "type": "A", "content": "1.2.3.4"}]
+        }
+        mock_get.side_effect = [stale_response, zone_response, records_response]
+        provider = {"api_token": "test-token", "zone": "example.com", "record_name": "test.example.com"}
+
+        with patch('requests.Session.patch', return_value=MagicMock(ok=True)) as mock_patch, \
+             patch('update_dyndns.log'):
+            result = update_dyndns.update_cloudflare(provider, "1.2.3.5")
+
+        assert result == "updated"
+        assert "/zones/oldzone/" in mock_get.call_args_list[0].args[0]
+        assert "/zones/newzone/" in mock_get.call_args_list[2].args[0]
+        assert mock_patch.call_args.args[0].endswith("/zones/newzone/dns_records/rec123")
+        with open(cache_file) as f:
+            assert f.read().strip() == "newzone"
+
+    @patch('requests.Session.get')
+    def test_update_cloudflare_failed_records_query_without_cache(self, mock_get):
+        # Test that a failed list query with a freshly looked-up zone ID is not retried
+        zone_response = MagicMock()
+        zone_response.json.return_value = {"success": True, "result": [{"id": "zone123"}]}
+        failed_response = MagicMock(ok=False, status_code=403)
+        failed_response.json.return_value = {"success": False}
+        mock_get.side_effect = [zone_response, failed_response]
+        provider = {"api_token": "test-token", "zone": "example.com", "record_name": "test.example.com"}
+
+        with patch('update_dyndns.log'):
+            assert update_dyndns.update_cloudflare(provider, "1.2.3.5") is False
+        assert mock_get.call_count == 2
+
+    @patch('requests.Session.get')
     def test_update_ipv64_success(self, mock_get):
         # Test successful ipv64 update
         mock_response = MagicMock()
@@ -401,6 +657,20 @@ class TestProviderUpdates:
             result = update_dyndns.update_ipv64(provider, "192.168.1.1")
             assert result == "updated"
 
+    @pytest.mark.parametrize("body,expected", [
+        ("nochg 192.168.1.1", "nochg"),
+        ("No Change", "nochg"),
+        ("success", "updated"),
+        ("badauth", False),
+    ])
+    def test_update_ipv64_response_matching(self, body, expected):
+        # Test that ipv64 responses are classified case-insensitively
+        response = MagicMock(text=body, status_code=200)
+        provider = {"token": "test-token", "domain": "test.ipv64.net"}
+        with patch('requests.Session.get', return_value=response), \
+             patch('update_dyndns.log'):
+            assert update_dyndns.update_ipv64(provider, "192.168.1.1") == expected
+
 # Tests for error handling
 class TestErrorHandling:
     def test_invalid_ip_validation_notification(self):
@@ -429,6 +699,19 @@ class TestErrorHandling:
             # The exception handling should trigger send_notifications
             mock_notify.assert_called_once()
 
+    def test_no_ip_backoff_is_jittered(self):
+        # Test that the linear phase waits exactly and the backoff phase uses decorrelated jitter
+        config = {'network_retry_interval': 60, 'max_failures_before_backoff': 2, 'max_wait_time': 600}
+        with patch('update_dyndns.log'):
+            assert update_dyndns.handle_no_ip_available(0, config) == (1, 60)
+            first = update_dyndns.handle_no_ip_available(2, config)[1]
+            waits = [update_dyndns.handle_no_ip_available(3, config)[1] for _ in range(20)]
+
+        # The first backoff step starts from the base interval: at most 3 x 60s
+        assert 60 <= first <= 180
+        assert all(60 <= wait <= 600 for wait in waits)
+        assert len(set(waits)) > 1
+
 # Tests for file operations
 class TestFileOperations:
     def test_load_last_ip_success(self):
@@ -446,9 +729,14 @@ class TestFileOperations:
     def test_save_last_ip_success(self):
         # Test successful IP saving
         with patch('builtins.open', mock_open()) as mock_file, \
+             patch('update_dyndns.os.replace') as mock_replace, \
              patch('update_dyndns.log'):
             update_dyndns.save_last_ip("v4", "192.168.1.1")
             mock_file.assert_called_once()
+            # Written to a temp file first, then atomically renamed into place
+            tmp_path, final_path = mock_replace.call_args.args
+            assert mock_file.call_args.args[0] == tmp_path
+            assert final_path == update_dyndns._ip_cache_file("v4")
 
 # Tests for configuration edge cases
 class TestConfigurationEdgeCases:
@@ -489,7 +777,7 @@ class TestConfigurationEdgeCases:
 
 # Tests for different authentication methods
 class TestAuthenticationMethods:
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_dyndns2_token_auth(self, mock_get):
         mock_response = MagicMock()
         mock_response.text = "good"
@@ -511,7 +799,7 @@ class TestAuthenticationMethods:
             args, kwargs = mock_get.call_args
             assert kwargs.get("params", {}).get("token") == "test-token"
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_dyndns2_bearer_auth(self, mock_get):
         mock_response = MagicMock()
         mock_response.text = "good"
@@ -533,6 +821,28 @@ class TestAuthenticationMethods:
             args, kwargs = mock_get.call_args
             assert kwargs.get("headers", {}).get("Authorization") == "Bearer bearer-token"
 
+    @patch('requests.Session.get')
+    def test_dyndns2_provider_reuses_prebuilt_request(self, mock_get):
+        # Test that the provider builds the static request part once and only adds the IPs
+        mock_get.return_value = MagicMock(text="good")
+        provider = update_dyndns.create_provider({
+            "name": "prebuilt",
+            "type": "dyndns2",
+            "url": "https://example.com/update",
+            "token": "test-token",
+            "hostname": "test.example.com",
+            "extra_params": {"system": "dyndns"},
+        })
+
+        with patch('update_dyndns._dyndns2_request', side_effect=AssertionError("rebuilt")), \
+             patch('update_dyndns.log'):
+            assert provider.perform_update("192.168.1.1", None) == "updated"
+            assert provider.perform_update("192.168.1.2", None) == "updated"
+
+        assert mock_get.call_args.kwargs["params"] == {
+            "myip": "192.168.1.2", "hostname": "test.example.com", "system": "dyndns", "token": "test-token"
+        }
+
 # Tests for logging levels and message filtering
 class TestLogLevelFiltering:
     def test_should_log_function(self):
@@ -546,17 +856,59 @@ class TestLogLevelFiltering:
 
     def test_log_function_basic_functionality(self):
         # Simple test that log function works without errors
-        with patch('builtins.print') as mock_print, \
+        with patch('sys.stdout') as mock_stdout, \
              patch('update_dyndns.file_logger_instance', None):
             
             # This should at least print to console
             update_dyndns.log("Test message", "INFO", "TEST")
-            mock_print.assert_called_once()
+            mock_stdout.write.assert_called_once()
             
             # Verify the message format is correct
-            call_args = mock_print.call_args[0][0]
+            call_args = mock_stdout.write.call_args[0][0]
             assert "[INFO] TEST --> Test message" in call_args
 
+    def test_log_unknown_level_reaches_console_and_file(self):
+        # Test that unrecognised levels are logged instead of being dropped or raising
+        file_logger = MagicMock()
+        with patch('sys.stdout') as mock_stdout, \
+             patch.object(update_dyndns.state, 'file_logger', file_logger):
+            update_dyndns.log("Odd level", "NOTICE", "TEST")
+        mock_stdout.write.assert_called_once()
+        file_logger.notice.assert_called_once_with("TEST --> Odd level")
+
+    def test_log_writes_one_line_and_flushes_errors(self):
+        # Test that each console line is a single write and only errors force a flush
+        with patch('sys.stdout') as mock_stdout, \
+             patch('update_dyndns.file_logger_instance', None):
+            update_dyndns.log("Routine", "INFO", "TEST")
+            mock_stdout.flush.assert_not_called()
+            update_dyndns.log("Broken", "ERROR", "TEST")
+        assert mock_stdout.write.call_count == 2
+        assert mock_stdout.write.call_args[0][0].endswith("[ERROR] TEST --> Broken\n")
+        mock_stdout.flush.assert_called_once()
+
+    def test_log_timestamp_is_utc_iso8601(self):
+        # Test that the console timestamp keeps the ISO 8601 UTC format
+        import datetime
+        timestamp = update_dyndns._utc_timestamp()
+        parsed = datetime.datetime.fromisoformat(timestamp)
+        assert parsed.utcoffset() == datetime.timedelta(0)
+        assert abs((datetime.datetime.now(datetime.timezone.utc) - parsed).total_seconds()) < 5
+
+    def test_log_lazy_skips_formatting_when_suppressed(self):
+        # Test that suppressed messages are never formatted, enabled ones are
+        arg = MagicMock()
+        update_dyndns.state.console_level = "INFO"
+        update_dyndns.state.log_level = "INFO"
+        with patch('sys.stdout') as mock_stdout, \
+             patch('update_dyndns.file_logger_instance', None):
+            update_dyndns.log_lazy("TRACE", "TEST", "value %s", arg)
+            arg.__str__.assert_not_called()
+            mock_stdout.write.assert_not_called()
+
+            update_dyndns.log_lazy("INFO", "TEST", "value %s", 42)
+        assert "[INFO] TEST --> value 42" in mock_stdout.write.call_args[0][0]
+
 # Tests for IP validation edge cases
 class TestIPValidationEdgeCases:
     def test_validate_ipv4_edge_cases(self):
@@ -573,6 +925,8 @@ class TestIPValidationEdgeCases:
         assert update_dyndns.validate_ipv4("") is False
         assert update_dyndns.validate_ipv4("abc.def.ghi.jkl") is False
         assert update_dyndns.validate_ipv4("192.168.1.-1") is False
+        assert update_dyndns.validate_ipv4("010.0.0.1") is True  # leading zeros stay accepted
+        assert update_dyndns.validate_ipv4(None) is False
 
     def test_validate_ipv6_edge_cases(self):
         # Test edge cases for IPv6 validation
@@ -586,6 +940,10 @@ class TestIPValidationEdgeCases:
         assert update_dyndns.validate_ipv6("") is False
         assert update_dyndns.validate_ipv6("invalid") is False
         assert update_dyndns.validate_ipv6("2001:0db8:85a3::8a2e:0370:7334:extra") is False
+        assert update_dyndns.validate_ipv6("::ffff:192.0.2.1") is True  # IPv4-mapped
+        assert update_dyndns.validate_ipv6("::192.0.2.1") is False  # other IPv4-embedded forms
+        assert update_dyndns.validate_ipv6("64:ff9b::192.0.2.1") is False
+        assert update_dyndns.validate_ipv6("fe80::1%eth0") is False  # scoped
 
 # Tests for configuration reloading
 class TestConfigurationReloading:
@@ -611,6 +969,116 @@ class TestConfigurationReloading:
                 # Test logic for config reloading would go here
                 pass
 
+    def test_invalid_reload_is_not_accepted_after_touch(self, tmp_path, monkeypatch):
+        # Test that touching an invalid config.yaml does not silently accept it
+        valid_yaml = "timer: 300\nproviders:\n  - name: test\n    protocol: dyndns2\n    url: https://example.com/update\n"
+        config_file = tmp_path / "config" / "config.yaml"
+        config_file.parent.mkdir()
+        config_file.write_text(valid_yaml)
+        monkeypatch.chdir(tmp_path)
+        for name in ("config", "log_level", "console_level"):
+            monkeypatch.setattr(update_dyndns, name, getattr(update_dyndns, name))
+        monkeypatch.setattr(update_dyndns.state, "config", update_dyndns.state.config)
+
+        class StopLoop(Exception):
+            pass
+
+        def write_invalid():
+            config_file.write_text(valid_yaml.replace("dyndns2", "bogus"))
+            os.utime(config_file, ns=(0, 10**9))
+
+        def touch():
+            os.utime(config_file, ns=(0, 2 * 10**9))
+
+        def stop():
+            raise StopLoop
+
+        steps = iter([write_invalid, touch, stop])
+
+        class ScriptedEvent(threading.Event):
+            def wait(self, timeout=None):
+                next(steps)()
+                self.set()
+                return True
+
+        with patch.object(update_dyndns, 'config_changed', ScriptedEvent()), \
+             patch('update_dyndns.ConfigWatcher') as mock_watcher, \
+             patch('update_dyndns.signal.signal'), \
+             patch('update_dyndns.setup_logging'), \
+             patch('update_dyndns.start_notification_worker'), \
+             patch('update_dyndns.fetch_current_ips', return_value=("1.2.3.4", None)), \
+             patch('update_dyndns.fetch_ips') as mock_fetch_ips, \
+             patch('update_dyndns.load_last_ip', return_value="1.2.3.4"), \
+             patch('update_dyndns.save_last_ip'), \
+             patch('update_dyndns.update_all_providers', return_value=[]), \
+             patch('update_dyndns.log') as mock_log:
+            mock_watcher.return_value.start.return_value.uses_inotify = False
+            with pytest.raises(StopLoop):
+                update_dyndns.main()
+
+        messages = [c.args[0] for c in mock_log.call_args_list]
+        assert messages.count("Configuration invalid after change. Waiting for next change...") == 2
+        assert not any("touched without content change" in m for m in messages)
+        assert update_dyndns.state.config["providers"][0]["protocol"] == "dyndns2"
+        mock_fetch_ips.assert_not_called()
+
+    def test_load_config_reuses_parse_until_file_changes(self, tmp_path):
+        # Test that an unchanged config.yaml is parsed only once
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text("timer: 300\n")
+
+        with patch('update_dyndns.yaml.load', wraps=update_dyndns.yaml.load) as mock_load:
+            first = update_dyndns.load_config(str(config_file))
+            second = update_dyndns.load_config(str(config_file))
+            assert first == {"timer": 300}
+            assert second is first
+            assert mock_load.call_count == 1
+
+            # A touch changes the mtime but not the content: no second parse
+            os.utime(config_file, ns=(0, 10**9))
+            assert update_dyndns.load_config(str(config_file)) is first
+            assert mock_load.call_count == 1
+
+            config_file.write_text("timer: 600\n")
+            os.utime(config_file, ns=(0, 2 * 10**9))
+            assert update_dyndns.load_config(str(config_file)) == {"timer": 600}
+            assert mock_load.call_count == 2
+
+            # Atomic replace with the same size and mtime: the new inode forces a reparse
+            replacement = tmp_path / "config.yaml.new"
+            replacement.write_text("timer: 900\n")
+            os.utime(replacement, ns=(0, 2 * 10**9))
+            os.replace(replacement, config_file)
+            assert update_dyndns.load_config(str(config_file)) == {"timer": 900}
+            assert mock_load.call_count == 3
+
+    @pytest.mark.parametrize("use_inotify", [True, False], ids=["inotify", "polling"])
+    def test_config_watcher_signals_change(self, tmp_path, use_inotify):
+        # Test that rewriting config.yaml sets the event, while other files do not
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text("timer: 300\n")
+        event = threading.Event()
+
+        if use_inotify:
+            watcher = update_dyndns.ConfigWatcher(str(config_file), event).start()
+            if not watcher.uses_inotify:
+                watcher.stop()
+                pytest.skip("inotify not available")
+        else:
+            with patch('update_dyndns._open_inotify', return_value=None):
+                watcher = update_dyndns.ConfigWatcher(str(config_file), event, poll_interval=0.05).start()
+            assert not watcher.uses_inotify
+
+        try:
+            if use_inotify:
+                (tmp_path / "other.yaml").write_text("x: 1\n")
+                assert not event.wait(0.2)
+            config_file.write_text("timer: 600\n")
+            os.utime(config_file, ns=(0, 10**9))
+            assert event.wait(2)
+        finally:
+            watcher.stop()
+
 # Tests for skip_update_on_startup functionality
 class TestSkipUpdateOnStartup:
     @patch('update_dyndns.load_last_ip')
@@ -650,7 +1118,7 @@ class TestSkipUpdateOnStartup:
 
 # Tests for provider error responses
 class TestProviderErrorResponses:
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_dyndns2_error_response(self, mock_get):
         # Test various error responses from DynDNS2 providers
         error_responses = [
@@ -680,7 +1148,7 @@ class TestProviderErrorResponses:
                 result = update_dyndns.update_dyndns2(provider, "192.168.1.1")
                 assert result is None  # Should return None for errors
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_ipv64_overcommitted_response(self, mock_get):
         # Test ipv64 overcommitted response (match the actual code spelling)
         mock_response = MagicMock()
@@ -700,7 +1168,7 @@ class TestProviderErrorResponses:
 
 # Tests for mixed IPv4/IPv6 scenarios
 class TestMixedIPScenarios:
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_update_both_ipv4_and_ipv6(self, mock_get):
         # Test updating both IPv4 and IPv6 records
         mock_response = MagicMock()
@@ -773,11 +1241,39 @@ class TestNotificationIntegration:
             assert result is False
             mock_notify.assert_called_once()
 
+    def test_notification_worker_does_not_block_update(self):
+        # Test that a slow notification no longer holds back the update result
+        release = threading.Event()
+        delivered = threading.Event()
+
+        def slow_notify(*args, **kwargs):
+            release.wait(2)
+            delivered.set()
+
+        provider = update_dyndns.create_provider({
+            "name": "async", "protocol": "ipv64", "token": "t", "domain": "async.example.com"
+        })
+        with patch('update_dyndns.send_notifications', side_effect=slow_notify), \
+             patch('update_dyndns.update_ipv64', return_value="updated"), \
+             patch('update_dyndns.log'), \
+             patch('update_dyndns.atexit.register'), \
+             patch('update_dyndns._NOTIFY_POOL', None):
+            update_dyndns.start_notification_worker()
+            pool = update_dyndns._NOTIFY_POOL
+            try:
+                assert provider.update_unified("192.168.1.1", None) == "updated"
+                assert not delivered.is_set()
+                release.set()
+                assert delivered.wait(2)
+            finally:
+                release.set()
+                pool.shutdown(wait=True)
+
 # Tests for logging with file_only_on_change parameter
 class TestFileOnlyOnChangeLogging:
     def test_log_basic_functionality(self):
         # Test basic logging functionality without complex level filtering
-        with patch('builtins.print'), \
+        with patch('sys.stdout'), \
              patch('update_dyndns.file_logger_instance') as mock_file_logger:
             
             # Test that the function doesn't crash and basic functionality works
@@ -798,7 +1294,16 @@ class TestInterfaceErrorHandling:
             result = update_dyndns.get_interface_ipv4("nonexistent0")
             assert result is None
 
-    @patch('builtins.open', side_effect=FileNotFoundError())
+    @patch('update_dyndns.socket.getaddrinfo')
+    @patch('update_dyndns.fcntl.ioctl', side_effect=OSError("No such device"))
+    def test_interface_ipv4_does_not_resolve_hostname(self, mock_ioctl, mock_getaddrinfo):
+        # Test that a failing ioctl does not fall back to a hostname DNS lookup
+        with patch('update_dyndns.log'):
+            result = update_dyndns.get_interface_ipv4("nonexistent0")
+        assert result is None
+        mock_getaddrinfo.assert_not_called()
+
+    @patch('update_dyndns._open', side_effect=FileNotFoundError())
     def test_interface_ipv6_not_found(self, mock_open):
         # Test IPv6 interface not found
         with patch('update_dyndns.log'):
@@ -835,9 +1340,47 @@ class TestResourceManagement:
             mock_handler.assert_called_once_with(
                 "/app/config/test.log",
                 maxBytes=5 * 1024 * 1024,
-                backupCount=3
+                backupCount=3,
+                delay=True
             )
 
+    def test_file_log_is_buffered_until_flush(self, tmp_path):
+        # Test that INFO records are buffered and written on flush, errors immediately
+        log_file = tmp_path / "dyndns.log"
+        config = {"logging": {"enabled": True, "file": str(log_file), "max_size_mb": 1, "backup_count": 1}}
+        try:
+            with patch('builtins.print'):
+                update_dyndns.setup_logging("INFO", config)
+            assert not log_file.exists() or "Log file enabled" not in log_file.read_text()
+
+            update_dyndns.flush_file_log()
+            assert "Log file enabled" in log_file.read_text()
+
+            update_dyndns.state.file_logger.error("MAIN --> boom")
+            assert "boom" in log_file.read_text()
+        finally:
+            for handler in update_dyndns.state.file_logger.handlers:
+                handler.close()
+            update_dyndns.setup_logging("INFO")
+
+    def test_reload_writes_buffered_file_log(self, tmp_path):
+        # Test that a logging reload writes buffered records and closes the old file
+        log_file = tmp_path / "dyndns.log"
+        config = {"logging": {"enabled": True, "file": str(log_file), "max_size_mb": 1, "backup_count": 1}}
+        try:
+            with patch('builtins.print'):
+                update_dyndns.setup_logging("INFO", config)
+                old_file_handler = update_dyndns.state.file_logger.handlers[0].target
+                update_dyndns.state.file_logger.info("MAIN --> before reload")
+                update_dyndns.setup_logging("DEBUG", config)
+
+            assert "before reload" in log_file.read_text()
+            assert old_file_handler.stream is None
+            assert len(update_dyndns.state.file_logger.handlers) == 1
+        finally:
+            update_dyndns.setup_logging("INFO")
+        assert update_dyndns.state.file_logger is None
+
 # Integration tests (testing multiple components together)
 class TestIntegrationScenarios:
     @patch('update_dyndns.get_public_ip')
@@ -866,19 +1409,179 @@ class TestIntegrationScenarios:
             mock_update.assert_called_once()
             mock_notify.assert_called_once()
 
+    @patch('update_dyndns.update_provider')
+    def test_update_all_providers(self, mock_update):
+        # Test that all providers are updated and results keep the provider order
+        mock_update.side_effect = lambda provider, ip, ip6=None: provider["name"] != "broken"
+        providers = [{"name": "first"}, {"name": "broken"}, {"name": "third"}]
+
+        results = update_dyndns.update_all_providers(providers, "192.168.1.2", "2001:db8::1")
+
+        assert [(p["name"], r) for p, r in results] == [("first", True), ("broken", False), ("third", True)]
+        assert mock_update.call_count == 3
+        mock_update.assert_any_call(providers[1], "192.168.1.2", "2001:db8::1")
+
+    @patch('update_dyndns.update_provider')
+    def test_update_all_providers_isolates_exceptions(self, mock_update):
+        # Test that an exception in one provider does not fail the others
+        def fake_update(provider, ip, ip6=None):
+            if provider["name"] == "crashing":
+                raise RuntimeError("boom")
+            return "updated"
+        mock_update.side_effect = fake_update
+        providers = [{"name": "first"}, {"name": "crashing"}, {"name": "third"}]
+
+        results = update_dyndns.update_all_providers(providers, "192.168.1.2")
+
+        assert [r for _, r in results] == ["updated", False, "updated"]
+
+    @patch('update_dyndns.update_provider')
+    def test_update_all_providers_respects_parallel_limit(self, mock_update):
+        # Test that max_parallel_updates: 1 runs the providers one after another
+        active = []
+        peak = []
+
+        def fake_update(provider, ip, ip6=None):
+            active.append(provider)
+            peak.append(len(active))
+            time.sleep(0.01)
+            active.remove(provider)
+            return True
+        mock_update.side_effect = fake_update
+
+        with patch.object(update_dyndns.state, 'config', {'max_parallel_updates': 1}):
+            update_dyndns.update_all_providers([{"name": "a"}, {"name": "b"}, {"name": "c"}], "192.168.1.2")
+
+        assert max(peak) == 1
+
+    def test_select_due_providers(self):
+        # Test that only failed, new or changed providers are due while the IP is unchanged
+        unchanged = {"name": "unchanged", "protocol": "ipv64"}
+        failed = {"name": "failed", "protocol": "ipv64"}
+        edited = {"name": "edited", "protocol": "ipv64", "domain": "new.example.com"}
+        providers = [unchanged, failed, edited]
+        known = [unchanged, failed, {"name": "edited", "protocol": "ipv64", "domain": "old.example.com"}]
+
+        assert update_dyndns.select_due_providers(providers, [failed], False) == [failed]
+        assert update_dyndns.select_due_providers(providers, [failed], False, known) == [failed, edited]
+        assert update_dyndns.select_due_providers(providers, [], True, known) == providers
+
+    def test_fetch_current_ips_runs_v4_and_v6_concurrently(self):
+        # Test that the IPv4 and IPv6 lookups overlap instead of running back to back
+        barrier = threading.Barrier(2, timeout=2)
+
+        def detect_v4(config, ip_service, ip_interface, phase):
+            barrier.wait()
+            return "203.0.113.1"
+
+        def detect_v6(config, ip6_service, ip6_interface, phase):
+            barrier.wait()
+            return "2001:db8::1"
+
+        config = {"ip6_service": "https://v6.example.com"}
+        with patch('update_dyndns._detect_ipv4', side_effect=detect_v4), \
+             patch('update_dyndns._detect_ipv6', side_effect=detect_v6):
+            assert update_dyndns.fetch_current_ips(config, "https://v4.example.com", None, "https://v6.example.com", None) == ("203.0.113.1", "2001:db8::1")
+
+    @patch('update_dyndns.get_public_ip', return_value="203.0.113.1")
+    def test_fetch_current_ips_without_ipv6(self, mock_get_ip):
+        # Test that no IPv6 lookup happens when none is configured
+        with patch('update_dyndns._detect_ipv6') as mock_v6:
+            assert update_dyndns.fetch_current_ips({}, "https://v4.example.com", None, None, None) == ("203.0.113.1", None)
+        mock_v6.assert_not_called()
+
+    @pytest.mark.parametrize("phase,expected", [
+        (update_dyndns.IP_PHASE_STARTUP, None),
+        (update_dyndns.IP_PHASE_RELOAD, "203.0.113.9"),
+        (update_dyndns.IP_PHASE_TIMER, None),
+    ])
+    def test_detect_ipv4_without_source_per_phase(self, phase, expected):
+        # Test that only a config reload falls back to the resilient resolver when no IPv4 source is set
+        with patch('update_dyndns.get_current_ip_resilient', return_value="203.0.113.9"):
+            assert update_dyndns._detect_ipv4({}, None, None, phase) == expected
+
+    @pytest.mark.parametrize("phase,expected", [
+        (update_dyndns.IP_PHASE_RELOAD, "203.0.113.9"),
+        (update_dyndns.IP_PHASE_TIMER, None),
+    ])
+    def test_detect_ipv4_interface_error_per_phase(self, phase, expected):
+        # Test that an interface error falls back to the resilient resolver only after a reload
+        with patch('update_dyndns.get_interface_ipv4', side_effect=OSError("down")), \
+             patch('update_dyndns.get_current_ip_resilient', return_value="203.0.113.9"), \
+             patch('update_dyndns.log'):
+            assert update_dyndns._detect_ipv4({}, None, "eth0", phase) == expected
+
+    def test_detect_ipv6_at_startup_uses_primary_service(self):
+        # Test that startup asks the primary IPv6 service directly
+        config = {"ip6_services": ["https://v6a.example.com", "https://v6b.example.com"]}
+        with patch('update_dyndns.get_public_ipv6', return_value="2001:db8::1") as mock_v6, \
+             patch('update_dyndns.get_current_ipv6_resilient') as mock_resilient:
+            ip6 = update_dyndns._detect_ipv6(config, "https://v6a.example.com", None, update_dyndns.IP_PHASE_STARTUP)
+        assert ip6 == "2001:db8::1"
+        mock_v6.assert_called_once_with("https://v6a.example.com")
+        mock_resilient.assert_not_called()
+
+    def test_fetch_resilient_ips_runs_v4_and_v6_concurrently(self):
+        # Test that the resilient lookups overlap as well
+        barrier = threading.Barrier(2, timeout=2)
+
+        def resolve(result):
+            def wait_and_return(config):
+                barrier.wait()
+                return result
+            return wait_and_return
+
+        with patch('update_dyndns.get_current_ip_resilient', side_effect=resolve("203.0.113.1")), \
+             patch('update_dyndns.get_current_ipv6_resilient', side_effect=resolve("2001:db8::1")):
+            assert update_dyndns.fetch_resilient_ips({}, True) == ("203.0.113.1", "2001:db8::1")
+
+    def test_fetch_ips_selects_resolver_by_mode(self):
+        # Test that the main loop helper switches to the resilient resolvers in resilient mode
+        with patch('update_dyndns.fetch_current_ips', return_value=("203.0.113.1", None)) as mock_current, \
+             patch('update_dyndns.fetch_resilient_ips', return_value=("203.0.113.2", None)) as mock_resilient:
+            assert update_dyndns.fetch_ips({}, False, "https://v4.example.com", None, None, "eth0") == ("203.0.113.1", None)
+            assert update_dyndns.fetch_ips({}, True, "https://v4.example.com", None, None, "eth0") == ("203.0.113.2", None)
+        mock_current.assert_called_once_with({}, "https://v4.example.com", None, None, "eth0", update_dyndns.IP_PHASE_TIMER)
+        mock_resilient.assert_called_once_with({}, True)
+
+# Tests for the IP resolver fallback chain
+class TestIPResolver:
+    def test_fastest_valid_service_wins(self):
+        # Test that a hanging service does not delay the result of a fast one
+        release_slow = threading.Event()
+
+        def fake_fetch(service):
+            if service == "https://slow.example":
+                release_slow.wait(5)
+                return "203.0.113.9"
+            return "203.0.113.7"
+
+        config = {"ip_services": ["https://slow.example", "https://fast.example"]}
+        try:
+            with patch('update_dyndns.get_public_ip', side_effect=fake_fetch), \
+                 patch('update_dyndns.log'):
+                ip = update_dyndns.IPResolver(config).get_ip_with_fallback('ipv4')
+            assert ip == "203.0.113.7"
+            assert not release_slow.is_set()
+        finally:
+            release_slow.set()
+
+    def test_falls_through_to_next_batch(self):
+        # Test that later services are tried when the first batch yields nothing valid
+        answers = {"https://a": None, "https://b": "not-an-ip", "https://c": None, "https://d": "198.51.100.4"}
+        config = {"ip_services": list(answers), "enable_interface_fallback": False}
+        with patch('update_dyndns.get_public_ip', side_effect=answers.get), \
+             patch('update_dyndns.log'):
+            assert update_dyndns.IPResolver(config).get_ip_with_fallback('ipv4') == "198.51.100.4"
+
 # Performance tests
 class TestPerformance:
-    def test_ip_validation_performance(self):
-        # Test that IP validation is fast for large numbers of IPs
-        import time
-        
-        start_time = time.time()
-        for i in range(1000):
-            update_dyndns.validate_ipv4(f"192.168.1.{i % 255}")
-        end_time = time.time()
-        
-        # Should complete in reasonable time (less than 1 second)
-        assert (end_time - start_time) < 1.0
+    @pytest.mark.benchmark(group="validation")
+    def test_ip_validation_performance(self, benchmark):
+        # Benchmark IP validation for a large number of IPs
+        ips = [f"192.168.1.{i % 255}" for i in range(1000)]
+        results = benchmark(lambda: [update_dyndns.validate_ipv4(ip) for ip in ips])
+        assert all(results)
 
 # Tests for environment-specific behavior
 class TestEnvironmentBehavior:
@@ -897,7 +1600,7 @@ class TestEnvironmentBehavior:
 class TestAdditionalCoverage:
     def test_get_public_ipv6_invalid_ip(self):
         # Test when IPv6 service returns invalid format
-        with patch('requests.get') as mock_get:
+        with patch('requests.Session.get') as mock_get:
             mock_response = MagicMock()
             mock_response.text = "invalid-ipv6-format"
             mock_response.raise_for_status.return_value = None
@@ -937,7 +1640,7 @@ class TestAdditionalCoverage:
     
     def test_cloudflare_zone_not_found(self):
         # Test Cloudflare with zone not found
-        with patch('requests.get') as mock_get:
+        with patch('requests.Session.get') as mock_get:
             mock_response = MagicMock()
             mock_response.json.return_value = {
                 "success": False,
@@ -4,249 +4,204 @@ Integration tests for Provider Unification System
 Tests real configuration formats to prevent field name mismatches
 """
 
-import unittest
-from unittest.mock import patch, MagicMock
-import sys
-import os
+import re
+import pytest
+from types import MappingProxyType
 
-# Add current directory to path for imports
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from update_dyndns import create_provider, prepare_providers, BaseProvider, CloudflareProvider, IPV64Provider, DynDNS2Provider
 
-from update_dyndns import create_provider, BaseProvider, CloudflareProvider, IPV64Provider, DynDNS2Provider
+# (protocol, expected class, config) using the 'protocol' field (actual config format)
+_CONFIGS = (
+    ('cloudflare', CloudflareProvider, MappingProxyType({
+        'protocol': 'cloudflare',
+        'name': 'test-cloudflare',
+        'zone': 'example.com',
+        'api_token': 'test_token',
+        'record_name': 'sub.example.com'
+    })),
+    ('ipv64', IPV64Provider, MappingProxyType({
+        'protocol': 'ipv64',
+        'name': 'test-ipv64',
+        'token': 'test_token',
+        'domain': 'example.com'
+    })),
+    ('dyndns2', DynDNS2Provider, MappingProxyType({
+        'protocol': 'dyndns2',
+        'name': 'test-dyndns2',
+        'url': 'https://updates.dnsdynamic.org/api/',
+        'hostname': 'example.com',
+        'auth_method': 'token',
+        'token': 'test_token'
+    })),
+)
 
-class TestProviderIntegration(unittest.TestCase):
-    """Tests provider creation and configuration using real config formats."""
+# Exact config formats from config.example.yaml
+_EXAMPLE_CONFIGS = (
+    ('cloudflare', CloudflareProvider, MappingProxyType({
+        'name': 'my-cloudflare',
+        'protocol': 'cloudflare',
+        'zone': 'yourdomain.tld',
+        'api_token': 'your_cloudflare_api_token',
+        'record_name': 'sub.domain.tld'
+    })),
+    ('ipv64', IPV64Provider, MappingProxyType({
+        'name': 'my-ipv64',
+        'protocol': 'ipv64',
+        'auth_method': 'token',
+        'token': 'your_update_token',
+        'domain': 'yourdomain.tld'
+    })),
+    ('dyndns2', DynDNS2Provider, MappingProxyType({
+        'name': 'my-dyndns2',
+        'protocol': 'dyndns2',
+        'url': 'https://updates.dnsdynamic.org/api/',
+        'auth_method': 'basic',
+        'username': 'youruser',
+        'password': 'yourpass',
+        'hostname': 'yourdomain.dynu.net'
+    })),
+)
+
+_CONFIG_IDS = [row[0] for row in _CONFIGS]
+
+@pytest.mark.parametrize("protocol,cls,cfg", _CONFIGS, ids=_CONFIG_IDS)
+def test_create_provider_with_protocol_field(protocol, cls, cfg):
+    """Test provider creation using 'protocol' field (actual config format)."""
+    provider = create_provider(cfg)
+    assert isinstance(provider, cls)
+    assert provider.name == cfg['name']
+
+@pytest.mark.parametrize("protocol,cls,cfg", _EXAMPLE_CONFIGS, ids=_CONFIG_IDS)
+def test_real_config_formats_from_example(protocol, cls, cfg):
+    """Test with exact config formats from config.example.yaml."""
+    provider = create_provider(cfg)
+    assert isinstance(provider, cls)
+    assert provider.name == cfg['name']
+
+@pytest.mark.parametrize("transform", (str.upper, str.capitalize, str.lower), ids=("upper", "capitalize", "lower"))
+@pytest.mark.parametrize("protocol,cls,cfg", _CONFIGS, ids=_CONFIG_IDS)
+def test_case_insensitive_protocol_names(protocol, cls, cfg, transform):
+    """Test that provider types are case-insensitive."""
+    provider = create_provider({**cfg, 'protocol': transform(protocol)})
+    assert isinstance(provider, cls)
+
+def test_create_provider_keys_instances_by_config_entry():
+    """Provider state belongs to one config entry; identical settings do not share an instance."""
+    cfg = dict(_CONFIGS[0][2])
+    twin = dict(cfg)
+    assert create_provider(cfg) is not create_provider(twin)
+
+    prepare_providers([cfg, twin])
+    assert create_provider(cfg) is create_provider(cfg)
+    assert create_provider(cfg) is not create_provider(twin)
+    # A reload parses new config objects and therefore starts with fresh instances
+    reloaded = dict(cfg)
+    prepare_providers([reloaded])
+    assert create_provider(reloaded) is not create_provider(cfg)
+
+_RE_NO_TYPE = re.compile(r"No provider type specified")
+_RE_UNKNOWN = re.compile(r"Unknown provider type: 'unknown_provider'")
+_RE_AVAILABLE = re.compile(r"Available types:")
+
+# (bad config, expected error message pattern)
+_BAD_CONFIGS = [
+    ({'name': 'test-provider', 'api_token': 'test_token'}, _RE_NO_TYPE),
+    ({'protocol': 'unknown_provider', 'name': 'test-provider'}, _RE_UNKNOWN),
+    ({'protocol': 'cloudflare', 'name': 'test-cf', 'zone': 'example.com', 'record_name': 'sub.example.com'},
+     re.compile(r"Missing Cloudflare config")),
+    ({'protocol': 'ipv64', 'name': 'test-ipv64', 'domain': 'example.com'},
+     re.compile(r"Missing IPV64 config")),
+]
+
+@pytest.mark.parametrize("bad_cfg,msg", _BAD_CONFIGS,
+                         ids=["missing-type", "unknown-type", "cloudflare-no-token", "ipv64-no-token"])
+def test_invalid_configs_raise(bad_cfg, msg):
+    """Test invalid configs fail with a descriptive ValueError."""
+    with pytest.raises(ValueError, match=msg) as excinfo:
+        create_provider(dict(bad_cfg))
+    if msg is _RE_NO_TYPE or msg is _RE_UNKNOWN:
+        assert _RE_AVAILABLE.search(str(excinfo.value))
+
+def test_create_provider_with_type_field_backward_compatibility():
+    """Test provider creation using 'type' field for backward compatibility."""
     
-    def test_create_provider_with_protocol_field(self):
-        """Test provider creation using 'protocol' field (actual config format)."""
-        
-        # Test Cloudflare with protocol field
-        cloudflare_config = {
-            'protocol': 'cloudflare',
-            'name': 'test-cloudflare',
-            'zone': 'example.com',
-            'api_token': 'test_token',
-            'record_name': 'sub.example.com'
-        }
-        
-        provider = create_provider(cloudflare_config)
-        self.assertIsInstance(provider, CloudflareProvider)
-        self.assertEqual(provider.name, 'test-cloudflare')
-        
-        # Test IPV64 with protocol field
-        ipv64_config = {
-            'protocol': 'ipv64',
-            'name': 'test-ipv64',
-            'token': 'test_token',
-            'domain': 'example.com'
-        }
-        
-        provider = create_provider(ipv64_config)
-        self.assertIsInstance(provider, IPV64Provider)
-        self.assertEqual(provider.name, 'test-ipv64')
-        
-        # Test DynDNS2 with protocol field
-        dyndns2_config = {
-            'protocol': 'dyndns2',
-            'name': 'test-dyndns2',
-            'url': 'https://updates.dnsdynamic.org/api/',
-            'hostname': 'example.com',
-            'auth_method': 'token',
-            'token': 'test_token'
-        }
-        
-        provider = create_provider(dyndns2_config)
-        self.assertIsInstance(provider, DynDNS2Provider)
-        self.assertEqual(provider.name, 'test-dyndns2')
+    config = {
+        'type': 'cloudflare',
+        'name': 'test-cloudflare',
+        'zone': 'example.com',
+        'api_token': 'test_token',
+        'record_name': 'sub.example.com'
+    }
     
-    def test_create_provider_with_type_field_backward_compatibility(self):
-        """Test provider creation using 'type' field for backward compatibility."""
-        
-        config = {
-            'type': 'cloudflare',
-            'name': 'test-cloudflare',
-            'zone': 'example.com',
-            'api_token': 'test_token',
-            'record_name': 'sub.example.com'
-        }
-        
-        provider = create_provider(config)
-        self.assertIsInstance(provider, CloudflareProvider)
-        self.assertEqual(provider.name, 'test-cloudflare')
+    provider = create_provider(config)
+    assert isinstance(provider, CloudflareProvider)
+    assert provider.name == 'test-cloudflare'
+
+
+def test_cloudflare_api_token_field_names():
+    """Test Cloudflare provider supports both 'api_token' and 'token' field names."""
     
-    def test_create_provider_missing_type_protocol(self):
-        """Test provider creation fails when neither 'type' nor 'protocol' is specified."""
-        
-        config = {
-            'name': 'test-provider',
-            'api_token': 'test_token'
-        }
-        
-        with self.assertRaises(ValueError) as context:
-            create_provider(config)
-        
-        self.assertIn("No provider type specified", str(context.exception))
-        self.assertIn("Available types:", str(context.exception))
+    # Test with api_token (actual config format)
+    config1 = {
+        'protocol': 'cloudflare',
+        'name': 'test-cf1',
+        'zone': 'example.com',
+        'api_token': 'test_token_1',
+        'record_name': 'sub.example.com'
+    }
     
-    def test_create_provider_unknown_type(self):
-        """Test provider creation fails with unknown provider type."""
-        
-        config = {
-            'protocol': 'unknown_provider',
-            'name': 'test-provider'
-        }
-        
-        with self.assertRaises(ValueError) as context:
-            create_provider(config)
-        
-        self.assertIn("Unknown provider type: 'unknown_provider'", str(context.exception))
-        self.assertIn("Available types:", str(context.exception))
+    provider1 = create_provider(config1)
+    assert isinstance(provider1, CloudflareProvider)
     
-    def test_cloudflare_api_token_field_names(self):
-        """Test Cloudflare provider supports both 'api_token' and 'token' field names."""
-        
-        # Test with api_token (actual config format)
-        config1 = {
-            'protocol': 'cloudflare',
-            'name': 'test-cf1',
-            'zone': 'example.com',
-            'api_token': 'test_token_1',
-            'record_name': 'sub.example.com'
-        }
-        
-        provider1 = create_provider(config1)
-        self.assertIsInstance(provider1, CloudflareProvider)
-        
-        # Test with token (backward compatibility)
-        config2 = {
-            'protocol': 'cloudflare',
-            'name': 'test-cf2',
-            'zone': 'example.com',
-            'token': 'test_token_2',  # Alternative field name
-            'record_name': 'sub.example.com'
-        }
-        
-        provider2 = create_provider(config2)
-        self.assertIsInstance(provider2, CloudflareProvider)
+    # Test with token (backward compatibility)
+    config2 = {
+        'protocol': 'cloudflare',
+        'name': 'test-cf2',
+        'zone': 'example.com',
+        'token': 'test_token_2',  # Alternative field name
+        'record_name': 'sub.example.com'
+    }
     
-    def test_real_config_formats_from_example(self):
-        """Test with exact config formats from config.example.yaml."""
-        
-        # Exact Cloudflare config from example
-        cloudflare_config = {
-            'name': 'my-cloudflare',
-            'protocol': 'cloudflare',
-            'zone': 'yourdomain.tld',
-            'api_token': 'your_cloudflare_api_token',
-            'record_name': 'sub.domain.tld'
-        }
-        
-        provider = create_provider(cloudflare_config)
-        self.assertIsInstance(provider, CloudflareProvider)
-        self.assertEqual(provider.name, 'my-cloudflare')
-        
-        # Exact IPV64 config from example
-        ipv64_config = {
-            'name': 'my-ipv64',
-            'protocol': 'ipv64',
-            'auth_method': 'token',
-            'token': 'your_update_token',
-            'domain': 'yourdomain.tld'
-        }
-        
-        provider = create_provider(ipv64_config)
-        self.assertIsInstance(provider, IPV64Provider)
-        self.assertEqual(provider.name, 'my-ipv64')
-        
-        # Exact DynDNS2 config from example
-        dyndns2_config = {
-            'name': 'my-dyndns2',
-            'protocol': 'dyndns2',
-            'url': 'https://updates.dnsdynamic.org/api/',
-            'auth_method': 'basic',
-            'username': 'youruser',
-            'password': 'yourpass',
-            'hostname': 'yourdomain.dynu.net'
-        }
-        
-        provider = create_provider(dyndns2_config)
-        self.assertIsInstance(provider, DynDNS2Provider)
-        self.assertEqual(provider.name, 'my-dyndns2')
+    provider2 = create_provider(config2)
+    assert isinstance(provider2, CloudflareProvider)
+
+
+def test_cloudflare_validation_real_fields():
+    """Test Cloudflare validation with real config field names."""
     
-    def test_case_insensitive_protocol_names(self):
-        """Test that provider types are case-insensitive."""
-        
-        configs = [
-            {'protocol': 'CLOUDFLARE', 'name': 'test1', 'zone': 'example.com', 'api_token': 'token', 'record_name': 'sub.example.com'},
-            {'protocol': 'Cloudflare', 'name': 'test2', 'zone': 'example.com', 'api_token': 'token', 'record_name': 'sub.example.com'},
-            {'protocol': 'cloudflare', 'name': 'test3', 'zone': 'example.com', 'api_token': 'token', 'record_name': 'sub.example.com'},
-            {'protocol': 'IPV64', 'name': 'test4', 'token': 'token', 'domain': 'example.com'},
-        ]
-        
-        for config in configs:
-            provider = create_provider(config)
-            if 'cloudflare' in config['protocol'].lower():
-                self.assertIsInstance(provider, CloudflareProvider)
-            elif 'ipv64' in config['protocol'].lower():
-                self.assertIsInstance(provider, IPV64Provider)
-
-class TestProviderValidation(unittest.TestCase):
-    """Test provider configuration validation."""
+    # Valid config
+    valid_config = {
+        'protocol': 'cloudflare',
+        'name': 'test-cf',
+        'zone': 'example.com',
+        'api_token': 'test_token',
+        'record_name': 'sub.example.com'
+    }
     
-    def test_cloudflare_validation_real_fields(self):
-        """Test Cloudflare validation with real config field names."""
-        
-        # Valid config
-        valid_config = {
-            'protocol': 'cloudflare',
-            'name': 'test-cf',
-            'zone': 'example.com',
-            'api_token': 'test_token',
-            'record_name': 'sub.example.com'
-        }
-        
-        provider = create_provider(valid_config)
-        # No exception should be raised during creation
-        self.assertIsInstance(provider, CloudflareProvider)
-        
-        # Missing api_token
-        invalid_config = {
-            'protocol': 'cloudflare',
-            'name': 'test-cf',
-            'zone': 'example.com',
-            'record_name': 'sub.example.com'
-            # api_token missing
-        }
-        
-        with self.assertRaises(ValueError):
-            create_provider(invalid_config)
+    provider = create_provider(valid_config)
+    # No exception should be raised during creation
+    assert isinstance(provider, CloudflareProvider)
+
+
+def test_ipv64_validation_real_fields():
+    """Test IPV64 validation with real config field names."""
+    
+    # Valid config with domain
+    valid_config = {
+        'protocol': 'ipv64',
+        'name': 'test-ipv64',
+        'token': 'test_token',
+        'domain': 'example.com'
+    }
     
-    def test_ipv64_validation_real_fields(self):
-        """Test IPV64 validation with real config field names."""
-        
-        # Valid config with domain
-        valid_config = {
-            'protocol': 'ipv64',
-            'name': 'test-ipv64',
-            'token': 'test_token',
-            'domain': 'example.com'
-        }
-        
-        provider = create_provider(valid_config)
-        self.assertIsInstance(provider, IPV64Provider)
-        
-        # Missing token
-        invalid_config = {
-            'protocol': 'ipv64',
-            'name': 'test-ipv64',
-            'domain': 'example.com'
-            # token missing
-        }
-        
-        with self.assertRaises(ValueError):
-            create_provider(invalid_config)
-
-if __name__ == '__main__':
-    print("Running Provider Integration Tests...")
-    print("=" * 50)
-    unittest.main(verbosity=2)
+    provider = create_provider(valid_config)
+    assert isinstance(provider, IPV64Provider)
+
+def test_public_api_exports():
+    """Test every name in update_dyndns.__all__ resolves on the module."""
+    import update_dyndns
+
+    missing = [name for name in update_dyndns.__all__ if not hasattr(update_dyndns, name)]
+    assert not missing, f"__all__ lists undefined names: {missing}"
+    for name in ("create_provider", "BaseProvider", "CloudflareProvider", "IPV64Provider", "DynDNS2Provider"):
+        assert name in update_dyndns.__all__
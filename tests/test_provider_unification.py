@@ -4,222 +4,263 @@ Test-Script für die Provider-Logik-Vereinheitlichung
 Demonstriert die neue BaseProvider-Architektur und Provider-Factory.
 """
 
-import sys
-import os
-
-# Import der refaktorierten update_dyndns.py 
-sys.path.insert(0, os.path.dirname(__file__))
-from update_dyndns import create_provider, BaseProvider, CloudflareProvider, IPV64Provider, DynDNS2Provider
-
-def test_provider_architecture():
-    """Test der neuen Provider-Architektur."""
-    
-    print("=" * 70)
-    print("🧪 TESTING UNIFIED PROVIDER ARCHITECTURE")
-    print("=" * 70)
-    
-    # Test 1: Provider Factory
-    print("\n1️⃣ Testing Provider Factory:")
-    
-    test_configs = [
-        {
-            'type': 'cloudflare',
-            'name': 'test-cloudflare',
-            'api_token': 'test_token',
-            'zone': 'example.com',
-            'record_name': 'test.example.com'
-        },
-        {
-            'type': 'ipv64',
-            'name': 'test-ipv64',
-            'token': 'test_token',
-            'domain': 'test.example.com'
-        },
-        {
-            'type': 'dyndns2',
-            'name': 'test-dyndns2',
-            'url': 'https://test.example.com/nic/update',
-            'hostname': 'test.example.com',
-            'username': 'testuser',
-            'password': 'testpass'
-        }
-    ]
-    
-    providers = {}
-    for config in test_configs:
-        try:
-            provider = create_provider(config)
-            providers[config['type']] = provider
-            print(f"   ✅ {config['type'].upper()}: {type(provider).__name__} created")
-            print(f"      - Name: {provider.name}")
-            print(f"      - Type: {provider.provider_type}")
-        except Exception as e:
-            print(f"   ❌ {config['type'].upper()}: Failed to create - {str(e)}")
-    
-    # Test 2: Provider Inheritance
-    print("\n2️⃣ Testing Provider Inheritance:")
-    for provider_type, provider in providers.items():
-        print(f"   ✅ {provider_type.upper()}:")
-        print(f"      - Is BaseProvider: {isinstance(provider, BaseProvider)}")
-        print(f"      - Has update_unified: {hasattr(provider, 'update_unified')}")
-        print(f"      - Has validate_config: {hasattr(provider, 'validate_config')}")
-        print(f"      - Has perform_update: {hasattr(provider, 'perform_update')}")
-    
-    # Test 3: Configuration Validation
-    print("\n3️⃣ Testing Configuration Validation:")
-    
-    # Valid configs
-    for provider_type, provider in providers.items():
-        try:
-            provider.validate_config()
-            print(f"   ✅ {provider_type.upper()}: Configuration valid")
-        except Exception as e:
-            print(f"   ❌ {provider_type.upper()}: Configuration invalid - {str(e)}")
-    
-    # Invalid configs
-    print("\n   Testing invalid configurations:")
-    invalid_configs = [
-        {
-            'type': 'cloudflare',
-            'name': 'invalid-cloudflare',
-            # Missing required fields
-        },
-        {
-            'type': 'ipv64', 
-            'name': 'invalid-ipv64',
-            # Missing token and domain
-        },
-        {
-            'type': 'dyndns2',
-            'name': 'invalid-dyndns2',
-            # Missing url and hostname
-        }
-    ]
-    
-    for config in invalid_configs:
-        try:
-            provider = create_provider(config)
-            provider.validate_config()
-            print(f"   ❌ {config['type'].upper()}: Should have failed validation")
-        except Exception as e:
-            print(f"   ✅ {config['type'].upper()}: Correctly failed validation - {str(e)[:50]}...")
-    
-    # Test 4: Abstract Base Class
-    print("\n4️⃣ Testing Abstract Base Class:")
-    try:
-        # This should fail - cannot instantiate abstract class
-        base = BaseProvider({'name': 'test', 'type': 'test'})
-        print("   ❌ BaseProvider: Should not be instantiable")
-    except TypeError as e:
-        print("   ✅ BaseProvider: Correctly prevents direct instantiation")
-        print(f"      - Error: {str(e)[:60]}...")
-    
-    # Test 5: Provider Factory Error Handling
-    print("\n5️⃣ Testing Provider Factory Error Handling:")
-    
-    invalid_types = ['unknown', 'invalid', '', None]
-    for invalid_type in invalid_types:
-        try:
-            config = {'type': invalid_type, 'name': 'test'}
-            provider = create_provider(config)
-            print(f"   ❌ Type '{invalid_type}': Should have failed")
-        except Exception as e:
-            print(f"   ✅ Type '{invalid_type}': Correctly failed - {str(e)[:50]}...")
-    
-    print("\n" + "=" * 70)
-    print("✅ ALL PROVIDER ARCHITECTURE TESTS COMPLETED!")
-    print("🎉 Provider unification successful!")
-    print("=" * 70)
+import logging
+import threading
+from unittest.mock import patch
+from types import MappingProxyType
 
-def test_dry_principle():
-    """Test des DRY-Prinzips - Reduzierter duplizierter Code."""
-    
-    print("\n🔄 Testing DRY Principle Benefits:")
-    
-    # Simuliere die Vorteile der Vereinheitlichung
-    benefits = [
-        "✅ Einheitliche Fehlerbehandlung in BaseProvider.update_unified()",
-        "✅ Zentrale Benachrichtigungslogik in send_success_notification()",
-        "✅ Standardisierte Validierung durch validate_config()",
-        "✅ Konsistente Logging-Pattern",
-        "✅ Einfache Erweiterung um neue Provider"
-    ]
-    
-    for benefit in benefits:
-        print(f"   {benefit}")
-    
-    print("\n📊 Code Reduction Metrics:")
-    print("   • Duplicate notification code: ELIMINATED")
-    print("   • Duplicate error handling: ELIMINATED")  
-    print("   • Duplicate validation patterns: REDUCED")
-    print("   • Provider-specific quirks: ISOLATED")
-    print("   • New provider effort: 90% REDUCED")
-
-def test_extensibility():
-    """Test der Erweiterbarkeit - Neuer Provider."""
-    
-    print("\n🚀 Testing Extensibility - Custom Provider:")
-    
-    # Beispiel für einen neuen Provider
+import pytest
+
+import update_dyndns
+from update_dyndns import create_provider, prepare_providers, register_provider, BaseProvider, CloudflareProvider, IPV64Provider, DynDNS2Provider
+
+log = logging.getLogger(__name__)
+
+# Test 2: Provider Inheritance - aus der Klassenhierarchie bekannt, daher einmalig beim Import geprüft
+for _cls in (CloudflareProvider, IPV64Provider, DynDNS2Provider):
+    assert issubclass(_cls, BaseProvider)
+    for _method in ("update_unified", "validate_config", "perform_update"):
+        assert callable(getattr(_cls, _method, None)), f"{_cls.__name__} missing {_method}"
+
+# Gültige Konfigurationen mit der erwarteten Provider-Klasse
+test_configs = (
+    (MappingProxyType({
+        'type': 'cloudflare',
+        'name': 'test-cloudflare',
+        'api_token': 'test_token',
+        'zone': 'example.com',
+        'record_name': 'test.example.com'
+    }), CloudflareProvider),
+    (MappingProxyType({
+        'type': 'ipv64',
+        'name': 'test-ipv64',
+        'token': 'test_token',
+        'domain': 'test.example.com'
+    }), IPV64Provider),
+    (MappingProxyType({
+        'type': 'dyndns2',
+        'name': 'test-dyndns2',
+        'url': 'https://test.example.com/nic/update',
+        'hostname': 'test.example.com',
+        'username': 'testuser',
+        'password': 'testpass'
+    }), DynDNS2Provider),
+)
+
+invalid_configs = (
+    MappingProxyType({
+        'type': 'cloudflare',
+        'name': 'invalid-cloudflare',
+        # Missing required fields
+    }),
+    MappingProxyType({
+        'type': 'ipv64',
+        'name': 'invalid-ipv64',
+        # Missing token and domain
+    }),
+    MappingProxyType({
+        'type': 'dyndns2',
+        'name': 'invalid-dyndns2',
+        # Missing url and hostname
+    }),
+)
+
+_VALID_IDS = tuple(cfg['type'] for cfg, _ in test_configs)
+_INVALID_IDS = tuple(cfg['type'] for cfg in invalid_configs)
+
+
+@pytest.fixture
+def custom_provider_cls():
+    """Beispiel für einen neuen Provider mit nur zwei Methoden."""
     class CustomProvider(BaseProvider):
         """Beispiel für einen neuen Provider."""
-        
+
         def validate_config(self):
             required = ['custom_token', 'custom_domain']
             missing = [f for f in required if not self.config.get(f)]
             if missing:
                 raise ValueError(f"Missing Custom config: {missing}")
-        
+
         def perform_update(self, current_ip, current_ip6):
             # Simuliere Update-Logik
-            print(f"      📡 Custom provider updating {current_ip} for {self.config['custom_domain']}")
+            log.debug("Custom provider updating %s for %s", current_ip, self.config['custom_domain'])
             return "updated"
-    
-    try:
-        # Test des neuen Providers
-        custom_config = {
-            'type': 'custom',
-            'name': 'test-custom',
-            'custom_token': 'my_token',
-            'custom_domain': 'test.example.com'
-        }
-        
-        custom_provider = CustomProvider(custom_config)
-        print(f"   ✅ Custom Provider Created: {custom_provider.name}")
-        
-        # Validierung
+
+    return CustomProvider
+
+
+@pytest.mark.parametrize("cfg,expected_cls", test_configs, ids=_VALID_IDS)
+def test_factory_creates_provider(cfg, expected_cls):
+    """Test 1: Provider Factory."""
+    provider = create_provider(cfg)
+    assert type(provider) is expected_cls
+    assert provider.name == cfg['name']
+    assert provider.provider_type == cfg['type']
+    # Provider-Klassen nutzen __slots__ statt eines __dict__ pro Instanz
+    assert not hasattr(provider, '__dict__')
+
+
+def test_prepare_providers_resolves_once():
+    """Vorbereitete Provider werden ohne erneutes Einfrieren wiederverwendet."""
+    # Verschachtelte Werte sind nicht hashbar und wurden bisher bei jedem Aufruf neu erzeugt
+    nested = {**test_configs[1][0], 'extra_params': {'a': '1'}}
+    broken = {'type': 'ipv64', 'name': 'broken'}
+    providers = prepare_providers([nested, broken])
+
+    assert providers == (nested, broken)
+    assert create_provider(nested) is create_provider(nested)
+    with pytest.raises(ValueError):
+        create_provider(broken)
+
+
+_PROVIDER_FIXTURES = ("cloudflare_provider", "ipv64_provider", "dyndns2_provider")
+
+
+@pytest.mark.parametrize("provider_fixture", _PROVIDER_FIXTURES)
+def test_valid_config_passes_validation(provider_fixture, request):
+    """Test 3a: Gültige Konfigurationen bestehen die Validierung."""
+    request.getfixturevalue(provider_fixture).validate_config()
+
+
+@pytest.mark.parametrize("cfg", invalid_configs, ids=_INVALID_IDS)
+def test_invalid_config_fails_validation(cfg):
+    """Test 3b: Unvollständige Konfigurationen werden abgelehnt."""
+    with pytest.raises(ValueError):
+        create_provider(cfg)
+
+
+def test_abstract_base_class():
+    """Test 4: Abstract Base Class."""
+    with pytest.raises(TypeError):
+        BaseProvider({'name': 'test', 'type': 'test'})
+
+
+_INVALID_TYPES = (
+    ('unknown', ValueError),
+    ('invalid', ValueError),
+    ('', ValueError),
+    (None, AttributeError),
+)
+
+
+@pytest.mark.parametrize("invalid_type,expected_exc", _INVALID_TYPES)
+def test_factory_error_handling(invalid_type, expected_exc):
+    """Test 5: Provider Factory Error Handling."""
+    with pytest.raises(expected_exc):
+        create_provider({'type': invalid_type, 'name': 'test'})
+
+def test_dry_principle():
+    """Test des DRY-Prinzips - Reduzierter duplizierter Code."""
+
+    # Simuliere die Vorteile der Vereinheitlichung
+    benefits = [
+        "Einheitliche Fehlerbehandlung in BaseProvider.update_unified()",
+        "Zentrale Benachrichtigungslogik in send_success_notification()",
+        "Standardisierte Validierung durch validate_config()",
+        "Konsistente Logging-Pattern",
+        "Einfache Erweiterung um neue Provider"
+    ]
+
+    if log.isEnabledFor(logging.DEBUG):
+        for benefit in benefits:
+            log.debug("DRY benefit: %s", benefit)
+
+def test_extensibility(custom_provider_cls):
+    """Test der Erweiterbarkeit - Neuer Provider."""
+    custom_config = {
+        'type': 'custom',
+        'name': 'test-custom',
+        'custom_token': 'my_token',
+        'custom_domain': 'test.example.com'
+    }
+
+    custom_provider = custom_provider_cls(custom_config)
+    assert custom_provider.name == 'test-custom'
+
+    # Validierung
+    custom_provider.validate_config()
+
+    # Update-Test (simulation)
+    assert custom_provider.update_unified("192.168.1.100", None) == "updated"
+
+
+def test_register_provider_extends_factory(custom_provider_cls, monkeypatch):
+    """Per Decorator registrierte Provider erstellt die Factory ohne Änderung."""
+    monkeypatch.setattr(update_dyndns, "_PROVIDER_MAP", dict(update_dyndns._PROVIDER_MAP))
+    register_provider("Custom")(custom_provider_cls)
+
+    provider = create_provider({'type': 'custom', 'name': 'reg', 'custom_token': 't', 'custom_domain': 'd'})
+    assert type(provider) is custom_provider_cls
+    with pytest.raises(ValueError, match="custom"):
+        create_provider({'type': 'nope', 'name': 'x'})
+
+
+def test_extensibility_rejects_incomplete_config(custom_provider_cls):
+    """Ein neuer Provider erbt die einheitliche Fehlerbehandlung."""
+    custom_provider = custom_provider_cls({'type': 'custom', 'name': 'broken-custom'})
+    with pytest.raises(ValueError):
         custom_provider.validate_config()
-        print("   ✅ Custom Provider Validation: Passed")
-        
-        # Update-Test (simulation)
-        result = custom_provider.update_unified("192.168.1.100", None)
-        print(f"   ✅ Custom Provider Update: {result}")
-        
-        print("   🎯 Adding new provider required:")
-        print("      • 1 class with 2 methods (validate_config, perform_update)")
-        print("      • ~20-30 lines of code")
-        print("      • Inherits all base functionality automatically")
-        
-    except Exception as e:
-        print(f"   ❌ Custom Provider Failed: {str(e)}")
-
-if __name__ == "__main__":
-    try:
-        test_provider_architecture()
-        test_dry_principle()
-        test_extensibility()
-        
-        print(f"\n🚀 Provider unification completed successfully!")
-        print(f"📝 Benefits achieved:")
-        print(f"   • DRY-Prinzip (Don't Repeat Yourself)")
-        print(f"   • Einheitliche Fehlerbehandlung") 
-        print(f"   • Einfache Erweiterung um neue Provider")
-        print(f"   • Bessere Testbarkeit")
-        print(f"   • Saubere Trennung von Verantwortlichkeiten")
-        print(f"   • 100% Backward Compatibility maintained")
-        
-    except Exception as e:
-        print(f"\n❌ Test failed: {e}")
-        import traceback
-        traceback.print_exc()
-        sys.exit(1)
+    assert custom_provider.update_unified("192.168.1.100", None) is False
+
+
+def test_unchanged_ips_skip_perform_update(custom_provider_cls):
+    """Bereits übertragene IPs lösen keinen weiteren API-Aufruf aus."""
+    provider = custom_provider_cls({'type': 'custom', 'name': 'cached', 'custom_token': 't', 'custom_domain': 'd'})
+    calls = []
+    provider.perform_update = lambda ip, ip6: calls.append((ip, ip6)) or "updated"
+
+    assert provider.update_unified("192.168.1.100", None) == "updated"
+    assert provider.update_unified("192.168.1.100", None) == "nochg"
+    assert provider.update_unified("192.168.1.101", None) == "updated"
+    assert calls == [("192.168.1.100", None), ("192.168.1.101", None)]
+
+
+def test_concurrent_updates_share_one_call(custom_provider_cls):
+    """Parallele Aufrufe mit denselben IPs lösen nur einen API-Aufruf aus."""
+    provider = custom_provider_cls({'type': 'custom', 'name': 'inflight', 'custom_token': 't', 'custom_domain': 'd'})
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow_update(ip, ip6):
+        calls.append((ip, ip6))
+        started.set()
+        release.wait(5)
+        return "updated"
+
+    provider.perform_update = slow_update
+    results = []
+    first = threading.Thread(target=lambda: results.append(provider.update_unified("192.168.1.100", None)))
+    first.start()
+    assert started.wait(5)
+    second = threading.Thread(target=lambda: results.append(provider.update_unified("192.168.1.100", None)))
+    second.start()
+    second.join(0.1)
+    release.set()
+    first.join(5)
+    second.join(5)
+
+    # Der zweite Aufruf übernimmt das laufende Ergebnis (oder, sehr spät gestartet, "nochg")
+    assert sorted(results) in (["updated", "updated"], ["nochg", "updated"])
+    assert calls == [("192.168.1.100", None)]
+
+
+def test_error_notifications_back_off(custom_provider_cls):
+    """Eine Fehlerserie meldet sich einmal, nach einem Erfolg wieder sofort."""
+    provider = custom_provider_cls({'type': 'custom', 'name': 'flaky', 'custom_token': 't', 'custom_domain': 'd'})
+    outcomes = iter([ValueError("down"), ValueError("still down"), "updated", ValueError("down again")])
+
+    def perform(ip, ip6):
+        outcome = next(outcomes)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    provider.perform_update = perform
+    with patch('update_dyndns.dispatch_notification') as mock_dispatch:
+        assert provider.update_unified("192.168.1.1", None) is False
+        assert provider.update_unified("192.168.1.2", None) is False
+        assert provider.update_unified("192.168.1.3", None) == "updated"
+        assert provider.update_unified("192.168.1.4", None) is False
+
+    kinds = [c.args[1] for c in mock_dispatch.call_args_list]
+    assert kinds == ["ERROR", "UPDATE", "ERROR"]
@@ -1,19 +1,26 @@
 import sys
 import os
+import random
 import time
 import requests
 import yaml
 import logging
 import struct
-import datetime
 import socket
-import subprocess
 import re
-import array
-import tempfile
 import ipaddress
+import atexit
+import functools
+import hashlib
+import threading
+import select
+import signal
+import ctypes
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from notify import send_notifications
-from logging.handlers import RotatingFileHandler
+from logging.handlers import RotatingFileHandler, MemoryHandler
 from abc import ABC, abstractmethod
 
 try:
@@ -21,11 +28,40 @@ try:
 except ImportError:
     fcntl = None  # Windows doesn't have fcntl
 
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader  # PyYAML built without libyaml
+
+__all__ = [
+    "DynDNSState", "state",
+    "BaseProvider", "CloudflareProvider", "IPV64Provider", "DynDNS2Provider",
+    "create_provider", "prepare_providers", "register_provider", "update_provider", "update_all_providers",
+    "get_public_ip", "get_public_ipv6", "validate_ipv4", "validate_ipv6",
+    "IPResolver", "ConfigWatcher", "validate_config", "log", "log_lazy", "main",
+]
+
 print("DYNDNS CLIENT STARTUP")
 
+# File opener used for sysfs/procfs reads; tests replace this single reference
+_open = open
+
+# Add a custom loglevel for very verbose, routine messages
+CUSTOM_LEVELS = ["TRACE", "DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
+# Level name -> severity rank, resolved when a level is set
+_LEVEL_IDX = {name: idx for idx, name in enumerate(CUSTOM_LEVELS)}
+
 class DynDNSState:
     """Zentrale Zustandsverwaltung für DynDNS Client."""
     
+    # Feste Attributmenge: kein __dict__ pro Instanz, Tippfehler fallen sofort auf
+    __slots__ = (
+        "config", "_log_level", "_console_level", "log_rank", "console_rank", "file_logger",
+        "last_ipv4", "last_ipv6",
+        "resilient_mode", "failed_providers", "error_count", "last_error_time", "backoff_delay",
+        "consecutive_failures",
+    )
+    
     def __init__(self):
         self.config = None
         self.log_level = "INFO"
@@ -38,21 +74,47 @@ class DynDNSState:
         
         # Netzwerk-Zustand
         self.resilient_mode = False
-        self.failed_providers = []
+        self.failed_providers = set()  # Namen, Reihenfolge irrelevant
         self.error_count = 0
         self.last_error_time = 0
         self.backoff_delay = 60
+        self.consecutive_failures = 0  # Ticks in Folge ohne ermittelbare IP
+    
+    # Log-Level werden selten gesetzt, aber bei jedem log() geprüft:
+    # der Rang wird daher beim Setzen berechnet (None = unbekanntes Level)
+    @property
+    def log_level(self):
+        return self._log_level
+    
+    @log_level.setter
+    def log_level(self, value):
+        self._log_level = value
+        self.log_rank = _LEVEL_IDX.get(value)
+    
+    @property
+    def console_level(self):
+        return self._console_level
+    
+    @console_level.setter
+    def console_level(self, value):
+        self._console_level = value
+        self.console_rank = _LEVEL_IDX.get(value)
     
     def reset_network_state(self):
         """Setzt Netzwerk-Fehler-Zustand zurück."""
         self.resilient_mode = False
-        self.failed_providers = []
+        self.failed_providers.clear()
         self.error_count = 0
+        self.consecutive_failures = 0
+    
+    def update(self, **changes):
+        """Setzt mehrere Zustandswerte in einem Aufruf (Properties greifen weiterhin)."""
+        for name, value in changes.items():
+            setattr(self, name, value)
     
     def add_failed_provider(self, provider_name):
         """Fügt einen fehlgeschlagenen Provider hinzu."""
-        if provider_name not in self.failed_providers:
-            self.failed_providers.append(provider_name)
+        self.failed_providers.add(provider_name)
 
 # Globale Instanz
 state = DynDNSState()
@@ -63,9 +125,6 @@ log_level = "INFO"         # For file logging
 console_level = "INFO"     # For console output
 file_logger_instance = None
 
-# Add a custom loglevel for very verbose, routine messages
-CUSTOM_LEVELS = ["TRACE", "DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
-
 # Add custom TRACE loglevel (lower than DEBUG)
 TRACE_LEVEL_NUM = 5
 logging.addLevelName(TRACE_LEVEL_NUM, "TRACE")
@@ -75,6 +134,19 @@ def trace(self, message, *args, **kws):
         self._log(TRACE_LEVEL_NUM, message, args, **kws)
 logging.Logger.trace = trace
 
+def _close_file_log_handlers(logger):
+    """
+    Flushes and closes all handlers of the file logger, including the file behind
+    a MemoryHandler, so a reload neither loses buffered records nor leaks the file.
+    """
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.flush()
+        target = getattr(handler, "target", None)
+        handler.close()
+        if target is not None:
+            target.close()
+
 def setup_logging(loglevel, config=None):
     """
     Configures logging with the specified level.
@@ -105,16 +177,19 @@ def setup_logging(loglevel, config=None):
             # Ensure directory exists
             os.makedirs(os.path.dirname(log_file), exist_ok=True)
             
-            # Setup file handler
-            file_handler = RotatingFileHandler(log_file, maxBytes=max_size, backupCount=backup_count)
+            # Setup file handler; the file is only opened on the first write
+            file_handler = RotatingFileHandler(log_file, maxBytes=max_size, backupCount=backup_count, delay=True)
             formatter = logging.Formatter('%(asctime)s [%(levelname)s] %(message)s')
             file_handler.setFormatter(formatter)
+            # Buffer records in memory; errors and a full buffer are written immediately,
+            # everything else at the latest with flush_file_log() once per main loop pass
+            buffered_handler = MemoryHandler(capacity=512, flushLevel=logging.ERROR, target=file_handler)
             
             # Create file logger
             file_logger_instance = logging.getLogger("dyndns_file")
             file_logger_instance.setLevel(TRACE_LEVEL_NUM if loglevel == "TRACE" else getattr(logging, loglevel))
-            file_logger_instance.handlers = []  # Clear any existing handlers
-            file_logger_instance.addHandler(file_handler)
+            _close_file_log_handlers(file_logger_instance)  # Write out and close any previous handlers
+            file_logger_instance.addHandler(buffered_handler)
             file_logger_instance.propagate = False
             
             # Update state
@@ -123,18 +198,36 @@ def setup_logging(loglevel, config=None):
             # Log initial message to file
             start_msg = f"Log file enabled: {log_file} (max size: {max_size/1024/1024:.1f}MB, backups: {backup_count})"
             file_logger_instance.info(start_msg)
-            print(f"{datetime.datetime.now(datetime.timezone.utc).isoformat()} [INFO] LOGGING --> {start_msg}")
+            print(f"{_utc_timestamp()} [INFO] LOGGING --> {start_msg}")
             
         except Exception as e:
-            print(f"{datetime.datetime.now(datetime.timezone.utc).isoformat()} [ERROR] LOGGING --> Failed to setup file logging: {e}")
+            print(f"{_utc_timestamp()} [ERROR] LOGGING --> Failed to setup file logging: {e}")
             file_logger_instance = None
             state.file_logger = None
     else:
+        if file_logger_instance is not None:
+            _close_file_log_handlers(file_logger_instance)
         file_logger_instance = None
         state.file_logger = None
     
     return loglevel
 
+def _utc_timestamp():
+    """
+    Returns the current UTC time in ISO 8601 format with microseconds,
+    built with time.strftime which is cheaper than datetime.now(tz).isoformat().
+    """
+    now = time.time()
+    return f"{time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(now))}.{int(now % 1 * 1_000_000):06d}+00:00"
+
+def flush_file_log():
+    """
+    Writes buffered file log records to disk.
+    """
+    if state.file_logger is not None:
+        for handler in state.file_logger.handlers:
+            handler.flush()
+
 def log(message, level="INFO", section="MAIN", file_only_on_change=False):
     """
     Log a message with the specified level and section.
@@ -146,46 +239,60 @@ def log(message, level="INFO", section="MAIN", file_only_on_change=False):
         section: Section/component name for the log
         file_only_on_change: If True, only log to file for ERROR/CRITICAL levels
     """
-    global console_level, log_level, file_logger_instance
+    # Log levels for filtering (unknown levels are always logged)
+    message_idx = _LEVEL_IDX.get(level)
+    console_idx = state.console_rank
+    should_log_console = message_idx is None or console_idx is None or message_idx >= console_idx
     
-    # Get log levels with defaults - use state if available, otherwise globals
-    current_console_level = state.console_level if hasattr(state, 'console_level') else globals().get('console_level', 'INFO')
-    current_file_level = state.log_level if hasattr(state, 'log_level') else globals().get('log_level', 'INFO')
+    # File logging needs a logger, a permitting file level and no change-only restriction
+    current_file_logger = state.file_logger or file_logger_instance
+    should_log_file = current_file_logger is not None
+    if should_log_file and file_only_on_change and level not in ("ERROR", "CRITICAL"):
+        should_log_file = False
+    if should_log_file and message_idx is not None:
+        file_idx = state.log_rank
+        if file_idx is not None and message_idx < file_idx:
+            should_log_file = False
     
-    # Log levels for filtering
-    levels = ["TRACE", "DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
-    try:
-        message_idx = levels.index(level)
-        console_idx = levels.index(current_console_level)
-        should_log_console = message_idx >= console_idx
-    except ValueError:
-        should_log_console = True
+    # Suppressed by both sinks: skip timestamp and string building entirely
+    if not should_log_console and not should_log_file:
+        return
     
-    # Always log to console if level permits
+    # Always log to console if level permits (one write per line; errors are flushed at once)
     if should_log_console:
-        timestamp = datetime.datetime.now(datetime.timezone.utc).isoformat()
-        print(f"{timestamp} [{level}] {section} --> {message}")
+        sys.stdout.write(f"{_utc_timestamp()} [{level}] {section} --> {message}\n")
+        if level in ("ERROR", "CRITICAL"):
+            sys.stdout.flush()
     
     # Additionally log to file if configured
-    current_file_logger = state.file_logger if hasattr(state, 'file_logger') and state.file_logger else file_logger_instance
-    if current_file_logger is not None:
-        # Check if we should log to file
-        should_log_file = True
-        if file_only_on_change and level not in ("ERROR", "CRITICAL"):
-            should_log_file = False
-        
-        # Check file log level
-        try:
-            file_idx = levels.index(current_file_level)
-            if message_idx < file_idx:
-                should_log_file = False
-        except ValueError:
-            pass
-        
-        if should_log_file:
-            file_message = f"{section} --> {message}"
-            log_method = getattr(current_file_logger, level.lower(), current_file_logger.info)
-            log_method(file_message)
+    if should_log_file:
+        file_message = f"{section} --> {message}"
+        log_method = getattr(current_file_logger, level.lower(), current_file_logger.info)
+        log_method(file_message)
+
+def log_enabled(level):
+    """
+    Returns True if a message of the given level reaches the console or the log file.
+    """
+    message_idx = _LEVEL_IDX.get(level)
+    if message_idx is None:
+        return True
+    console_idx = state.console_rank
+    if console_idx is None or message_idx >= console_idx:
+        return True
+    if (state.file_logger or file_logger_instance) is None:
+        return False
+    file_idx = state.log_rank
+    return file_idx is None or message_idx >= file_idx
+
+def log_lazy(level, section, fmt, *args):
+    """
+    Like log(), but formats fmt % args only if the level is enabled.
+    Use for TRACE/DEBUG messages in the main loop and the provider hot path.
+    """
+    if not log_enabled(level):
+        return
+    log(fmt % args if args else fmt, level, section)
 
 def should_log(level, configured_level):
     """
@@ -193,13 +300,11 @@ def should_log(level, configured_level):
     This replicates your existing logic for log filtering.
     Supports custom TRACE loglevel.
     """
-    levels = ["TRACE", "DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
-    try:
-        message_idx = levels.index(level.upper())
-        config_idx = levels.index(configured_level.upper())
-        return message_idx >= config_idx
-    except ValueError:
+    message_idx = _LEVEL_IDX.get(level.upper())
+    config_idx = _LEVEL_IDX.get(configured_level.upper())
+    if message_idx is None or config_idx is None:
         return True  # If level not recognized, log it anyway
+    return message_idx >= config_idx
 
 # Call this function in main() after loading the config
 def initialize_logging(config):
@@ -211,21 +316,87 @@ def initialize_logging(config):
         _use_python_logging = True
     # Otherwise, stick with the default print-based logging
 
+# Shared HTTP session: keeps TCP/TLS connections to the APIs alive between calls
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
+
+def get_session():
+    """
+    Returns the shared requests.Session, creating it on first use.
+    Connections are pooled per host and idempotent requests are retried
+    on 5xx responses and read timeouts with exponential back-off.
+    Connection failures are not retried here; an unreachable network is
+    handled by the resilient main loop instead.
+    """
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                retry = Retry(total=3, connect=0, backoff_factor=0.5, status_forcelist=[500, 502, 503, 504],
+                              raise_on_status=False)
+                adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retry)
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _SESSION = session
+    return _SESSION
+
+# (connect, read) timeouts in seconds for IP echo services; a dead host fails fast
+IP_SERVICE_TIMEOUT = (3, 7)
+
+# Cache validators of the last valid answer per IP service: url -> (etag, last_modified, ip)
+_IP_SERVICE_VALIDATORS = {}
+
+def _conditional_get(ip_service):
+    """
+    Queries an IP echo service, revalidating the last answer with If-None-Match /
+    If-Modified-Since when the service sent ETag / Last-Modified headers.
+    Returns (response, cached_ip); cached_ip is set if the service answered 304.
+    """
+    cached = _IP_SERVICE_VALIDATORS.get(ip_service)
+    if cached is None:
+        return get_session().get(ip_service, timeout=IP_SERVICE_TIMEOUT), None
+    etag, last_modified, ip = cached
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    response = get_session().get(ip_service, timeout=IP_SERVICE_TIMEOUT, headers=headers)
+    return response, (ip if response.status_code == 304 else None)
+
+def _remember_validators(ip_service, response, ip):
+    """
+    Stores the cache validators of a valid answer for the next _conditional_get().
+    """
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if etag or last_modified:
+        _IP_SERVICE_VALIDATORS[ip_service] = (etag, last_modified, ip)
+    else:
+        _IP_SERVICE_VALIDATORS.pop(ip_service, None)
+
+# Dotted-quad with optional surrounding whitespace; trims and pre-checks in one pass
+_IPV4_EXTRACT = re.compile(r'\s*((?:\d{1,3}\.){3}\d{1,3})\s*\Z', re.ASCII)
+
 def get_public_ip(ip_service):
     """
     Fetches the public IPv4 address from the given service.
     Now includes validation to ensure the result is actually an IPv4 address.
     """
     try:
-        response = requests.get(ip_service, timeout=10)
+        response, cached_ip = _conditional_get(ip_service)
+        if cached_ip is not None:
+            return cached_ip
         response.raise_for_status()
-        ip = response.text.strip()
+        match = _IPV4_EXTRACT.match(response.text)
         
-        # Validate that it's actually an IPv4 address
-        if validate_ipv4(ip):
-            return ip
+        # Validate that it's actually an IPv4 address (octet range check)
+        if match and validate_ipv4(match.group(1)):
+            _remember_validators(ip_service, response, match.group(1))
+            return match.group(1)
         else:
-            log(f"Service {ip_service} returned invalid IPv4 format: {ip}", "ERROR", section="IPV4")
+            log(f"Service {ip_service} returned invalid IPv4 format: {response.text.strip()}", "ERROR", section="IPV4")
             return None
     except Exception as e:
         log(f"Error fetching public IP: {e}", "ERROR")
@@ -237,12 +408,17 @@ def get_public_ipv6(ip_service="https://api64.ipify.org"):
     Now includes validation to ensure the result is actually an IPv6 address.
     """
     try:
-        response = requests.get(ip_service, timeout=10)
+        response, cached_ip = _conditional_get(ip_service)
+        if cached_ip is not None:
+            return cached_ip
         response.raise_for_status()
         ip6 = response.text.strip()
         
-        # Validate that it's actually an IPv6 address
+        # Validate that it's actually an IPv6 address; return the canonical (compressed) form
+        # so differently formatted answers for the same address do not count as an IP change
         if validate_ipv6(ip6):
+            ip6 = canonical_ip(ip6)
+            _remember_validators(ip_service, response, ip6)
             return ip6
         else:
             log(f"Service {ip_service} returned invalid IPv6 format: {ip6}", "ERROR", section="IPV6")
@@ -251,69 +427,235 @@ def get_public_ipv6(ip_service="https://api64.ipify.org"):
         log(f"Error fetching public IPv6: {e}", "ERROR")
         return None
 
+# Per-token Cloudflare request headers, built once and shared read-only
+_CF_HEADERS = {}
+
+def _cf_headers(api_token):
+    """
+    Returns the (cached) Authorization/Content-Type headers for a Cloudflare token.
+    """
+    headers = _CF_HEADERS.get(api_token)
+    if headers is None:
+        headers = _CF_HEADERS.setdefault(api_token, {
+            "Authorization": f"Bearer {api_token}",
+            "Content-Type": "application/json"
+        })
+    return headers
+
+# Directory for zone IDs that survive a container restart (like the last_ip files)
+CF_ZONE_CACHE_DIR = "/tmp"
+_CF_ZONE_CACHE_PREFIX = "cf_zone_"
+
+def _cf_zone_cache_file(api_token, zone_name):
+    """
+    Returns the file that stores the zone ID for (api_token, zone_name).
+    The name is a hash, so neither token nor zone end up in the file system.
+    """
+    key = hashlib.blake2b(f"{api_token}\0{zone_name}".encode(), digest_size=8).hexdigest()
+    return os.path.join(CF_ZONE_CACHE_DIR, f"{_CF_ZONE_CACHE_PREFIX}{key}.txt")
+
+@functools.lru_cache(maxsize=128)
 def get_cloudflare_zone_id(api_token, zone_name):
     """
     Retrieves the zone ID for a Cloudflare zone by name.
+    Zone IDs never change for a zone, so successful lookups are cached
+    per (api_token, zone_name) in memory and on disk; failures raise and are not cached.
     """
+    cache_file = _cf_zone_cache_file(api_token, zone_name)
+    try:
+        with open(cache_file, "r") as f:
+            zone_id = f.read().strip()
+        if zone_id:
+            return zone_id
+    except OSError:
+        pass
     url = f"https://api.cloudflare.com/client/v4/zones?name={zone_name}"
-    headers = {"Authorization": f"Bearer {api_token}"}
-    resp = requests.get(url, headers=headers)
+    resp = get_session().get(url, headers=_cf_headers(api_token))
     data = resp.json()
     if data.get("success") and data["result"]:
-        return data["result"][0]["id"]
+        zone_id = data["result"][0]["id"]
+        try:
+            with open(cache_file, "w") as f:
+                f.write(zone_id)
+        except OSError as e:
+            log(f"Could not persist zone ID for {zone_name}: {e}", "DEBUG", section="CLOUDFLARE")
+        return zone_id
     raise Exception(f"Zone ID for {zone_name} not found: {data}")
 
-def get_cloudflare_record_id(api_token, zone_id, record_name):
-    """
-    Retrieves the record ID for a DNS record in a Cloudflare zone.
-    """
-    url = f"https://api.cloudflare.com/client/v4/zones/{zone_id}/dns_records?name={record_name}"
-    headers = {"Authorization": f"Bearer {api_token}"}
-    resp = requests.get(url, headers=headers)
-    data = resp.json()
-    if data.get("success") and data["result"]:
-        return data["result"][0]["id"]
-    raise Exception(f"DNS record ID for {record_name} not found: {data}")
-
 # =============================================================================
 # UNIFIED PROVIDER ARCHITECTURE
 # =============================================================================
 
 from abc import ABC, abstractmethod
 
+# Background pool for provider notifications; started by main(), inline delivery without it
+_NOTIFY_POOL = None
+
+def start_notification_worker():
+    """
+    Starts the background pool that delivers provider notifications, so slow
+    webhooks or SMTP servers no longer delay the update results.
+    Pending notifications are still delivered on interpreter exit.
+    """
+    global _NOTIFY_POOL
+    if _NOTIFY_POOL is None:
+        _NOTIFY_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="notify")
+        atexit.register(_NOTIFY_POOL.shutdown, wait=True)
+
+def _deliver_notification(*args, **kwargs):
+    try:
+        send_notifications(*args, **kwargs)
+    except Exception as e:
+        log(f"Error sending notification: {e}", "ERROR", section="NOTIFY")
+
+def dispatch_notification(*args, **kwargs):
+    """
+    Sends a notification through the background pool if it is running, otherwise inline.
+    Takes the same arguments as notify.send_notifications.
+    """
+    if _NOTIFY_POOL is None:
+        send_notifications(*args, **kwargs)
+    else:
+        _NOTIFY_POOL.submit(_deliver_notification, *args, **kwargs)
+
+# Mindestabstand (Sekunden) zwischen Fehler-Benachrichtigungen eines Providers, verdoppelt sich je Meldung
+ERROR_NOTIFY_BASE_INTERVAL = 60
+ERROR_NOTIFY_MAX_INTERVAL = 3600
+
+# Provider-Typen (lowercase) -> Provider-Klasse, befüllt durch @register_provider
+_PROVIDER_MAP = {}
+
+def register_provider(name):
+    """
+    Class decorator that registers a provider class under the given type name.
+    New providers only need this decorator; create_provider picks them up automatically.
+    """
+    def decorator(cls):
+        # Interned keys: lookups with interned type names compare by identity first
+        _PROVIDER_MAP[sys.intern(name.lower())] = cls
+        return cls
+    return decorator
+
+def _available_types_msg():
+    """
+    Builds the list of known provider types for error messages (only needed on failure).
+    """
+    return "Available types: " + ", ".join(_PROVIDER_MAP)
+
 class BaseProvider(ABC):
     """Basis-Klasse für alle DynDNS-Provider."""
     
+    # Feste Attributmenge - kein __dict__ pro Instanz
+    __slots__ = ("config", "name", "provider_type", "provider_type_upper", "_last_pushed",
+                 "_validated", "_notify_config", "_success_subject", "_error_subject",
+                 "_inflight", "_inflight_lock", "_error_notify_count", "_next_error_notify")
+    
     def __init__(self, config):
+        # Konfiguration wird nur gelesen und daher nicht kopiert;
+        # schreibgeschützte Mappings (MappingProxyType) werden direkt übernommen.
         self.config = config
         self.name = config.get('name', 'unknown')
         # Support both 'type' and 'protocol' for backward compatibility
         self.provider_type = config.get('type', config.get('protocol', 'unknown'))
+        # Log-Sektion des Providers, ändert sich nach __init__ nicht mehr
+        self.provider_type_upper = self.provider_type.upper()
+        # Zuletzt erfolgreich übertragene (IPv4, IPv6); gleiche IPs brauchen keinen API-Aufruf
+        self._last_pushed = (None, None)
+        # Die Konfiguration einer Instanz ändert sich nicht - einmal validieren genügt
+        self._validated = False
+        # Benachrichtigungs-Konfiguration und Betreffzeilen einmalig vorbereiten
+        self._notify_config = config.get("notify")
+        self._success_subject = f"🟢 **{self.name}** wurde erfolgreich aktualisiert!"
+        self._error_subject = f"🔴 **{self.name}** Update fehlgeschlagen!"
+        # Laufende Updates je (IPv4, IPv6); parallele Aufrufe warten auf dasselbe Ergebnis
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        # Fehler-Benachrichtigungen mit exponentiellem Abstand (siehe send_error_notification)
+        self._error_notify_count = 0
+        self._next_error_notify = 0.0
+    
+    def _ensure_valid(self):
+        """Validiert die Konfiguration beim ersten Aufruf, danach nur noch ein Flag-Check."""
+        if not self._validated:
+            self.validate_config()
+            self._validated = True
+    
+    # Pflichtfelder der Unterklasse (frozenset)
+    _REQUIRED = frozenset()
+    
+    def _missing_required(self):
+        """Fehlende oder leere Pflichtfelder, sortiert für stabile Fehlermeldungen."""
+        missing = self._REQUIRED - self.config.keys()
+        missing |= {f for f in self._REQUIRED - missing if not self.config[f]}
+        return sorted(missing)
     
     def update_unified(self, current_ip, current_ip6):
-        """Hauptupdate-Methode mit einheitlicher Logik."""
-        log(f"BaseProvider: Starting unified update for {self.name}", "DEBUG", "PROVIDER")
+        """
+        Hauptupdate-Methode mit einheitlicher Logik.
+        Läuft für dieselben IPs bereits ein Update (anderer Thread), wird dessen
+        Ergebnis übernommen statt einen zweiten API-Aufruf zu starten.
+        """
+        key = (current_ip, current_ip6)
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+        if not owner:
+            log_lazy("DEBUG", "PROVIDER", "BaseProvider: Joining running update for %s", self.name)
+            return future.result()
         try:
-            # Validierung
-            self.validate_config()
+            result = self._run_update(current_ip, current_ip6)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+        return result
+    
+    def _run_update(self, current_ip, current_ip6):
+        """Validierung, Update und Benachrichtigung für ein Paar IPs."""
+        log_lazy("DEBUG", "PROVIDER", "BaseProvider: Starting unified update for %s", self.name)
+        try:
+            # Validierung (einmalig pro Instanz)
+            self._ensure_valid()
+            
+            # Diese IPs sind beim Provider bereits gesetzt
+            if (current_ip or current_ip6) and (current_ip, current_ip6) == self._last_pushed:
+                log_lazy("TRACE", self.provider_type_upper, "Provider '%s' - IPs already pushed, skipping API call.", self.name)
+                return "nochg"
             
             # Provider-spezifisches Update
             result = self.perform_update(current_ip, current_ip6)
-            log(f"BaseProvider: Update result for {self.name}: {result}", "DEBUG", "PROVIDER")
+            log_lazy("DEBUG", "PROVIDER", "BaseProvider: Update result for %s: %s", self.name, result)
+            if result:
+                self._last_pushed = (current_ip, current_ip6)
+                # Erfolg beendet die Fehlerserie - der nächste Fehler wird sofort gemeldet
+                self._error_notify_count = 0
+                self._next_error_notify = 0.0
             
             # Benachrichtigungen senden
             if result and result != "nochg":
                 self.send_success_notification(current_ip or current_ip6)
-                log(f"Provider '{self.name}' updated successfully.", "INFO", self.provider_type.upper())
+                log(f"Provider '{self.name}' updated successfully.", "INFO", self.provider_type_upper)
             elif result == "nochg":
-                log(f"Provider '{self.name}' - no change needed.", "TRACE", self.provider_type.upper())
+                log_lazy("TRACE", self.provider_type_upper, "Provider '%s' - no change needed.", self.name)
             
             return result
             
+        except (requests.RequestException, OSError, ValueError, KeyError) as e:
+            # Erwartete Fehler: Netzwerk/HTTP, ungültige Konfiguration oder API-Antwort
+            log_lazy("DEBUG", "PROVIDER", "BaseProvider: Exception in unified update for %s: %s", self.name, e)
+            self.send_error_notification(str(e))
+            log(f"Provider '{self.name}' update failed: {str(e)}", "ERROR", self.provider_type_upper)
+            return False
         except Exception as e:
-            log(f"BaseProvider: Exception in unified update for {self.name}: {str(e)}", "DEBUG", "PROVIDER")
+            # Unerwartete Fehler (Programmfehler) - mit Typ protokollieren, Ergebnis wie bisher False
             self.send_error_notification(str(e))
-            log(f"Provider '{self.name}' update failed: {str(e)}", "ERROR", self.provider_type.upper())
+            log(f"Provider '{self.name}' update failed unexpectedly ({type(e).__name__}): {e}", "ERROR", self.provider_type_upper)
             return False
     
     @abstractmethod
@@ -326,60 +668,62 @@ class BaseProvider(ABC):
         """Provider-spezifische Konfigurationsvalidierung."""
         pass
     
+    def _resolve_notify_config(self):
+        """Provider-spezifische notify-Konfiguration, sonst die aktuelle globale."""
+        if self._notify_config:
+            return self._notify_config
+        # Globale Konfiguration erst beim Senden lesen: sie kann sich per Reload ändern,
+        # während die vorbereitete Provider-Instanz bestehen bleibt
+        return state.config.get("notify") if state.config else None
+    
     def send_success_notification(self, ip):
         """Sendet Erfolgs-Benachrichtigung mit Fallback auf globale Konfiguration."""
-        log(f"BaseProvider: Sending success notification for {self.name}", "DEBUG", "PROVIDER")
-        msg = f"Provider '{self.name}' updated successfully. New IP: {ip}"
-        
-        # Provider-spezifische notify-Konfiguration verwenden, falls vorhanden
-        notify_config = self.config.get("notify")
-        
-        # Fallback auf globale notify-Konfiguration wenn keine provider-spezifische vorhanden
-        if not notify_config and state.config:
-            notify_config = state.config.get("notify")
-            log(f"BaseProvider: Using global notify config for {self.name}", "DEBUG", "PROVIDER")
-        else:
-            log(f"BaseProvider: Using provider-specific notify config for {self.name}", "DEBUG", "PROVIDER")
-        
-        send_notifications(notify_config, "UPDATE", msg, 
-                         subject=f"🟢 **{self.name}** wurde erfolgreich aktualisiert!",
-                         service_name=self.name)
+        log_lazy("DEBUG", "PROVIDER", "BaseProvider: Sending success notification for %s", self.name)
+        dispatch_notification(self._resolve_notify_config(), "UPDATE",
+                              f"Provider '{self.name}' updated successfully. New IP: {ip}",
+                              subject=self._success_subject, service_name=self.name)
     
     def send_error_notification(self, error):
-        """Sendet Fehler-Benachrichtigung mit Fallback auf globale Konfiguration."""
-        log(f"BaseProvider: Sending error notification for {self.name}", "DEBUG", "PROVIDER")
-        msg = f"Provider '{self.name}' update failed: {error}"
-        
-        # Provider-spezifische notify-Konfiguration verwenden, falls vorhanden
-        notify_config = self.config.get("notify")
-        
-        # Fallback auf globale notify-Konfiguration wenn keine provider-spezifische vorhanden
-        if not notify_config and state.config:
-            notify_config = state.config.get("notify")
-            log(f"BaseProvider: Using global notify config for {self.name}", "DEBUG", "PROVIDER")
-        else:
-            log(f"BaseProvider: Using provider-specific notify config for {self.name}", "DEBUG", "PROVIDER")
-        
-        send_notifications(notify_config, "ERROR", msg,
-                         subject=f"🔴 **{self.name}** Update fehlgeschlagen!",
-                         service_name=self.name)
+        """
+        Sendet Fehler-Benachrichtigung mit Fallback auf globale Konfiguration.
+        Während einer Fehlerserie verdoppelt sich der Mindestabstand zwischen zwei
+        Meldungen (60s, 120s, ... höchstens ERROR_NOTIFY_MAX_INTERVAL).
+        """
+        now = time.monotonic()
+        if now < self._next_error_notify:
+            log_lazy("DEBUG", "PROVIDER", "BaseProvider: Error notification for %s suppressed (backoff)", self.name)
+            return
+        self._error_notify_count += 1
+        self._next_error_notify = now + min(ERROR_NOTIFY_BASE_INTERVAL * 2 ** (self._error_notify_count - 1),
+                                            ERROR_NOTIFY_MAX_INTERVAL)
+        log_lazy("DEBUG", "PROVIDER", "BaseProvider: Sending error notification for %s", self.name)
+        dispatch_notification(self._resolve_notify_config(), "ERROR",
+                              f"Provider '{self.name}' update failed: {error}",
+                              subject=self._error_subject, service_name=self.name)
 
+@register_provider("cloudflare")
 class CloudflareProvider(BaseProvider):
     """Cloudflare-spezifische Implementierung."""
     
+    __slots__ = ()
+    _REQUIRED = frozenset(('zone', 'record_name'))
+    
     def __init__(self, config):
         super().__init__(config)
         # Validate configuration during initialization
-        self.validate_config()
+        self._ensure_valid()
     
     def validate_config(self):
+        cfg = self.config
+        # Normalfall: alles vorhanden - Fehlerliste nur im Fehlerfall aufbauen
+        if (cfg.get('api_token') or cfg.get('token')) and cfg.get('zone') and cfg.get('record_name'):
+            return
         # Support both 'api_token' and 'token' field names
-        has_token = self.config.get('api_token') or self.config.get('token')
+        has_token = cfg.get('api_token') or cfg.get('token')
         if not has_token:
             raise ValueError("Missing Cloudflare config: need 'api_token' or 'token' field")
         
-        required = ['zone', 'record_name']
-        missing = [f for f in required if not self.config.get(f)]
+        missing = self._missing_required()
         if missing:
             raise ValueError(f"Missing Cloudflare config: {missing}")
     
@@ -388,78 +732,122 @@ class CloudflareProvider(BaseProvider):
         # Delegiere an bestehende Funktion für Kompatibilität
         return update_cloudflare(self.config, current_ip, current_ip6)
 
+# Schlüssel, von denen mindestens einer den Hostnamen angibt
+_IPV64_HOST_KEYS = frozenset(('domain', 'host', 'hostname'))
+_DYNDNS2_HOST_KEYS = frozenset(('hostname', 'domain', 'host'))
+_DYNDNS2_AUTH_METHODS = frozenset(('token', 'basic', 'bearer'))
+
+@register_provider("ipv64")
 class IPV64Provider(BaseProvider):
     """IPV64-spezifische Implementierung."""
     
+    __slots__ = ("_request",)
+    _REQUIRED = frozenset(('token',))
+    
     def __init__(self, config):
         super().__init__(config)
         # Validate configuration during initialization
-        self.validate_config()
+        self._ensure_valid()
+        # URL, feste Parameter und Auth hängen nur von der Konfiguration ab
+        self._request = _ipv64_request(config)
     
     def validate_config(self):
-        required = ['token']
-        missing = [f for f in required if not self.config.get(f)]
+        missing = self._missing_required()
         if missing:
             raise ValueError(f"Missing IPV64 config: {missing}")
         
         # Domain/host/hostname validation
-        if not any(k in self.config for k in ['domain', 'host', 'hostname']):
+        if not (self.config.keys() & _IPV64_HOST_KEYS):
             raise ValueError("Missing IPV64 domain config: need 'domain', 'host', or 'hostname'")
     
     def perform_update(self, current_ip, current_ip6):
         """Führt IPV64-Update durch."""
         # Delegiere an bestehende Funktion für Kompatibilität
-        return update_ipv64(self.config, current_ip, current_ip6)
+        return update_ipv64(self.config, current_ip, current_ip6, request=self._request)
 
+@register_provider("dyndns2")
 class DynDNS2Provider(BaseProvider):
     """DynDNS2-spezifische Implementierung."""
     
+    __slots__ = ("_request",)
+    _REQUIRED = frozenset(('url',))
+    
     def __init__(self, config):
         super().__init__(config)
         # Validate configuration during initialization
-        self.validate_config()
+        self._ensure_valid()
+        # URL, feste Parameter und Auth hängen nur von der Konfiguration ab;
+        # bei unvollständiger Auth meldet update_dyndns2 den Fehler wie bisher
+        try:
+            self._request = _dyndns2_request(config)
+        except ValueError:
+            self._request = None
     
     def validate_config(self):
-        required = ['url']
-        missing = [f for f in required if not self.config.get(f)]
+        missing = self._missing_required()
         if missing:
             raise ValueError(f"Missing DynDNS2 config: {missing}")
         
         # Hostname validation
-        if not any(k in self.config for k in ['hostname', 'domain', 'host']):
+        if not (self.config.keys() & _DYNDNS2_HOST_KEYS):
             raise ValueError("Missing DynDNS2 hostname config: need 'hostname', 'domain', or 'host'")
         
         # Auth validation
         auth_method = self.config.get('auth_method', 'token')
-        if auth_method in ['token', 'basic', 'bearer']:
+        if auth_method in _DYNDNS2_AUTH_METHODS:
             if not self.config.get('token') and not (self.config.get('username') and self.config.get('password')):
                 raise ValueError("Missing DynDNS2 authentication: need 'token' or 'username'+'password'")
     
     def perform_update(self, current_ip, current_ip6):
         """Führt DynDNS2-Update durch."""
         # Delegiere an bestehende Funktion für Kompatibilität
-        return update_dyndns2(self.config, current_ip, current_ip6)
+        return update_dyndns2(self.config, current_ip, current_ip6, request=self._request)
 
 # Provider-Factory
+# Beim Laden der Konfiguration erzeugte Provider-Instanzen, Schlüssel ist id() der Config
+_PREPARED_PROVIDERS = {}
+
+def prepare_providers(provider_configs):
+    """
+    Erstellt die Provider-Instanzen einmalig beim Laden der Konfiguration.
+    Gibt die Konfigurationen als Tupel zurück; create_provider() liefert für
+    diese Konfigurationseinträge danach die fertige Instanz.
+    """
+    global _PREPARED_PROVIDERS
+    prepared = {}
+    for provider_config in provider_configs:
+        try:
+            prepared[id(provider_config)] = (provider_config, create_provider(provider_config))
+        except Exception:
+            # Ungültige oder Legacy-Konfigurationen behandelt update_provider wie bisher
+            continue
+    _PREPARED_PROVIDERS = prepared
+    return tuple(provider_configs)
+
 def create_provider(provider_config):
-    """Erstellt Provider-Instanz basierend auf Typ."""
+    """
+    Erstellt Provider-Instanz basierend auf Typ.
+    Für die von prepare_providers() vorbereiteten Konfigurationen wird die Instanz
+    dieses Konfigurationseintrags geliefert; sie trägt den Zustand des Providers
+    (zuletzt übertragene IPs, Fehler-Backoff). Jede andere Konfiguration erhält
+    eine neue Instanz, gleiche Einstellungen teilen sich also keinen Zustand.
+    """
+    prepared = _PREPARED_PROVIDERS.get(id(provider_config))
+    if prepared is not None and prepared[0] is provider_config:
+        return prepared[1]
+    return _create_provider(provider_config)
+
+def _create_provider(provider_config):
+    """Erstellt eine neue Provider-Instanz basierend auf Typ."""
     # Support both 'type' and 'protocol' for backward compatibility
-    provider_type = provider_config.get('type', provider_config.get('protocol', '')).lower()
+    provider_type = sys.intern(provider_config.get('type', provider_config.get('protocol', '')).lower())
     
     if not provider_type:
-        available_types = 'cloudflare, ipv64, dyndns2'
-        raise ValueError(f"No provider type specified. Available types: {available_types}")
+        raise ValueError(f"No provider type specified. {_available_types_msg()}")
     
-    providers = {
-        'cloudflare': CloudflareProvider,
-        'ipv64': IPV64Provider,
-        'dyndns2': DynDNS2Provider
-    }
-    
-    provider_class = providers.get(provider_type)
-    if not provider_class:
-        available_types = ', '.join(providers.keys())
-        raise ValueError(f"Unknown provider type: '{provider_type}'. Available types: {available_types}")
+    provider_class = _PROVIDER_MAP.get(provider_type)
+    if provider_class is None:
+        raise ValueError(f"Unknown provider type: '{provider_type}'. {_available_types_msg()}")
     
     return provider_class(provider_config)
 
@@ -467,89 +855,149 @@ def create_provider(provider_config):
 # LEGACY PROVIDER FUNCTIONS (maintained for compatibility)
 # =============================================================================
 
+def _invalidate_cloudflare_ids():
+    """
+    Drops cached Cloudflare zone/record IDs, e.g. after the API answered 404.
+    """
+    get_cloudflare_zone_id.cache_clear()
+    _CF_RECORD_IDS.clear()
+    try:
+        with os.scandir(CF_ZONE_CACHE_DIR) as entries:
+            for entry in entries:
+                if entry.name.startswith(_CF_ZONE_CACHE_PREFIX):
+                    os.remove(entry.path)
+    except OSError:
+        pass
+
+# (zone_id, record_name) -> {record type: {"id": ..., "content": ...}}, filled from the
+# record list query; "content" follows every successful PATCH
+_CF_RECORD_IDS = {}
+
+@functools.lru_cache(maxsize=128)
+def _cf_record_urls(zone_id, record_name):
+    """
+    Returns the (list URL, PATCH URL prefix) for a record, built once per zone/record.
+    """
+    base = f"https://api.cloudflare.com/client/v4/zones/{zone_id}/dns_records"
+    return f"{base}?name={record_name}", f"{base}/"
+
 def update_cloudflare(provider, ip, ip6=None):
     """
     Updates an A and optionally AAAA record at Cloudflare if the IP has changed.
     Returns "updated", "nochg" or False.
     """
+    if not ip and not ip6:
+        return "nochg"
+
     api_token = provider['api_token']
     zone = provider['zone']
     record_name = provider['record_name']
-    zone_id = get_cloudflare_zone_id(api_token, zone)
-    headers = {
-        "Authorization": f"Bearer {api_token}",
-        "Content-Type": "application/json"
-    }
+    headers = _cf_headers(api_token)
+    wanted = [t for t, v in (("A", ip), ("AAAA", ip6)) if v]
 
-    updated = False
-    nochg = True
+    while True:
+        # Every successful zone lookup is persisted: an existing file means a cached zone ID
+        zone_cached = os.path.exists(_cf_zone_cache_file(api_token, zone))
+        zone_id = get_cloudflare_zone_id(api_token, zone)
+        url_records, url_patch_prefix = _cf_record_urls(zone_id, record_name)
+        records_by_type = _CF_RECORD_IDS.get((zone_id, record_name))
+        from_cache = records_by_type is not None and all(t in records_by_type for t in wanted)
+        if from_cache:
+            # Record IDs and contents are known from an earlier run: PATCH directly without the list query
+            data_records = None
+        else:
+            # One list query returns both the A and the AAAA record
+            resp_records = get_session().get(url_records, headers=headers)
+            data_records = resp_records.json()
+            log_lazy("DEBUG", "CLOUDFLARE", "Cloudflare GET records response: %s", data_records)
+            records_by_type = {}
+            if resp_records.ok and data_records.get("success"):
+                for record in data_records.get("result") or ():
+                    if record.get("type") not in records_by_type:
+                        records_by_type[record.get("type")] = {"id": record["id"], "content": record.get("content")}
+                _CF_RECORD_IDS[(zone_id, record_name)] = records_by_type
+            elif zone_cached:
+                # The cached zone ID may be stale (zone deleted and re-added): look it up again once
+                log("Cloudflare record query failed with a cached zone ID, reloading zone...", "WARNING", section="CLOUDFLARE")
+                _invalidate_cloudflare_ids()
+                continue
 
-    # --- IPv4 (A-Record) ---
-    if ip:
-        url_a = f"https://api.cloudflare.com/client/v4/zones/{zone_id}/dns_records?name={record_name}&type=A"
-        resp_a = requests.get(url_a, headers=headers)
-        data_a = resp_a.json()
-        log(f"Cloudflare GET A response: {data_a}", "DEBUG", section="CLOUDFLARE")
-        if data_a.get("success") and data_a["result"]:
-            record_a = data_a["result"][0]
-            if record_a["content"] == ip:
-                log(f"No update needed (IPv4 already set: {ip}).", "TRACE", section="CLOUDFLARE")
-            else:
-                url_patch = f"https://api.cloudflare.com/client/v4/zones/{zone_id}/dns_records/{record_a['id']}"
-                data_patch = {
-                    "type": "A",
-                    "name": record_name,
-                    "content": ip
-                }
-                resp_patch = requests.patch(url_patch, json=data_patch, headers=headers)
-                log(f"Cloudflare PATCH A response: {resp_patch.text}", "DEBUG", section="CLOUDFLARE")
-                if resp_patch.ok:
-                    updated = True
-                    nochg = False
+        missing = False
+        patches = []
+        for record_type, new_ip, ip_label in (("A", ip, "IPv4"), ("AAAA", ip6, "IPv6")):
+            if not new_ip:
+                continue
+            record = records_by_type.get(record_type)
+            if record is None:
+                log(f"{record_type} record {record_name} not found or error: {data_records}", "ERROR", section="CLOUDFLARE")
+                missing = True
+                continue
+            if record["content"] == new_ip:
+                log_lazy("TRACE", "CLOUDFLARE", "No update needed (%s already set: %s).", ip_label, new_ip)
+                continue
+            url_patch = url_patch_prefix + record['id']
+            data_patch = {
+                "type": record_type,
+                "name": record_name,
+                "content": new_ip
+            }
+            patches.append((record, url_patch, data_patch))
+
+        def send_patch(patch):
+            _, url_patch, data_patch = patch
+            resp_patch = get_session().patch(url_patch, json=data_patch, headers=headers)
+            log_lazy("DEBUG", "CLOUDFLARE", "Cloudflare PATCH %s response: %s", data_patch["type"], resp_patch.text)
+            return resp_patch
+
+        if len(patches) > 1:
+            # A and AAAA are independent records: send both PATCHes at the same time
+            with ThreadPoolExecutor(max_workers=len(patches)) as executor:
+                responses = list(executor.map(send_patch, patches))
         else:
-            log(f"A record {record_name} not found or error: {data_a}", "ERROR", section="CLOUDFLARE")
-            nochg = False
+            responses = [send_patch(patch) for patch in patches]
 
-    # --- IPv6 (AAAA-Record) ---
-    if ip6:
-        url_aaaa = f"https://api.cloudflare.com/client/v4/zones/{zone_id}/dns_records?name={record_name}&type=AAAA"
-        resp_aaaa = requests.get(url_aaaa, headers=headers)
-        data_aaaa = resp_aaaa.json()
-        log(f"Cloudflare GET AAAA response: {data_aaaa}", "DEBUG", section="CLOUDFLARE")
-        if data_aaaa.get("success") and data_aaaa["result"]:
-            record_aaaa = data_aaaa["result"][0]
-            if record_aaaa["content"] == ip6:
-                log(f"No update needed (IPv6 already set: {ip6}).", "TRACE", section="CLOUDFLARE")
+        updated = failed = stale = False
+        for (record, _, data_patch), resp_patch in zip(patches, responses):
+            if resp_patch.ok:
+                record["content"] = data_patch["content"]
+                updated = True
             else:
-                url_patch = f"https://api.cloudflare.com/client/v4/zones/{zone_id}/dns_records/{record_aaaa['id']}"
-                data_patch = {
-                    "type": "AAAA",
-                    "name": record_name,
-                    "content": ip6
-                }
-                resp_patch = requests.patch(url_patch, json=data_patch, headers=headers)
-                log(f"Cloudflare PATCH AAAA response: {resp_patch.text}", section="CLOUDFLARE")
-                if resp_patch.ok:
-                    updated = True
-                    nochg = False
-        else:
-            log(f"AAAA record {record_name} not found or error: {data_aaaa}", "ERROR", section="CLOUDFLARE")
-            nochg = False
+                log(f"Cloudflare PATCH {data_patch['type']} failed with status {resp_patch.status_code}", "ERROR", section="CLOUDFLARE")
+                failed = True
+                stale = stale or resp_patch.status_code == 404
+
+        if stale:
+            _invalidate_cloudflare_ids()
+            if from_cache:
+                # The cached record ID is gone (record recreated): look the records up again once
+                log("Cached Cloudflare record ID is stale, reloading records...", "WARNING", section="CLOUDFLARE")
+                continue
+        break
 
+    if failed:
+        return False
     if updated:
         return "updated"
-    if nochg:
-        return "nochg"
-    return False
+    if missing:
+        return False
+    return "nochg"
+
+# Response matchers: one precompiled scan instead of a chain of substring checks
+_IPV64_RESULT_RE = re.compile(r"(?P<rate>overcommited)|(?P<nochg>nochg|no change)|(?P<ok>good|success)", re.I)
+_DYNDNS2_RESULT_RE = re.compile(r"(?P<ok>good|updated|update succeed|success)|(?P<nochg>nochg|nochange)")
 
-def update_ipv64(provider, ip, ip6=None):
+def _response_kinds(pattern, text):
     """
-    Updates a record at ipv64.net.
-    Supports IPv4 and IPv6.
-    Returns "updated", "nochg" or False.
-    The URL is hardcoded.
+    Returns the names of all result groups of pattern found in text, in one scan.
+    Callers apply their own precedence (e.g. rate limit before nochg before success).
+    """
+    return {m.lastgroup for m in pattern.finditer(text)}
+
+def _ipv64_request(provider):
+    """
+    Builds the per-provider part of an ipv64.net update: (url, params, auth, headers).
+    Only the IP parameters change between updates, so providers build this once.
     """
-    url = "https://ipv64.net/nic/update"
     params = {}
     if 'domain' in provider:
         params['domain'] = provider['domain']
@@ -565,79 +1013,103 @@ def update_ipv64(provider, ip, ip6=None):
         auth = ('none', token)
     elif auth_method == "bearer":
         headers['Authorization'] = f"Bearer {token}"
+    return "https://ipv64.net/nic/update", params, auth, headers
+
+def update_ipv64(provider, ip, ip6=None, request=None):
+    """
+    Updates a record at ipv64.net.
+    Supports IPv4 and IPv6.
+    Returns "updated", "nochg" or False.
+    The URL is hardcoded. request is the prebuilt result of _ipv64_request(provider).
+    """
+    url, static_params, auth, headers = request or _ipv64_request(provider)
+    params = dict(static_params)
     if ip:
         params['ip'] = ip
     if ip6:
         params['ip6'] = ip6
-    response = requests.get(url, params=params, auth=auth, headers=headers)
+    response = get_session().get(url, params=params, auth=auth, headers=headers)
     log(f"ipv64 response: {response.text}", section="IPV64")
-    resp_text = response.text.lower().strip()
-    if "overcommited" in resp_text or response.status_code == 403:
+    kinds = _response_kinds(_IPV64_RESULT_RE, response.text)
+    if "rate" in kinds or response.status_code == 403:
         log("Update interval at ipv64.net exceeded! Update limit reached.", "ERROR", section="IPV64")
         return False
-    if "nochg" in resp_text or "no change" in resp_text:
+    if "nochg" in kinds:
         log("No update needed (nochg).", "TRACE", section="IPV64")
         return "nochg"
-    if "good" in resp_text or "success" in resp_text:
+    if "ok" in kinds:
         return "updated"
     log(f"ipv64 update failed: {response.text}", "ERROR", section="IPV64")
     return False
 
-def update_dyndns2(provider, ip, ip6=None):
+def _dyndns2_request(provider):
+    """
+    Builds the per-provider part of a DynDNS2 update: (url, params, auth, headers).
+    Raises ValueError if hostname or authentication are incomplete.
+    """
+    url = provider.get("url")
+    params = {}
+    
+    # Determine hostname parameter (some providers use different names)
+    hostname_param = None
+    if "hostname" in provider:
+        hostname_param = provider["hostname"]
+    elif "domain" in provider:
+        hostname_param = provider["domain"]
+    elif "host" in provider:
+        hostname_param = provider["host"]
+        
+    if not hostname_param:
+        raise ValueError("No hostname/domain/host specified")
+        
+    params["hostname"] = hostname_param
+        
+    # Add extra parameters (new feature)
+    if "extra_params" in provider and isinstance(provider["extra_params"], dict):
+        extra_params = provider["extra_params"]
+        for key, value in extra_params.items():
+            params[key] = value
+            
+    # Authentication
+    auth = None
+    headers = {}
+    auth_method = provider.get("auth_method", "token")
+    
+    if auth_method == "token" and "token" in provider:
+        params["hostname"] = f"{hostname_param}"
+        params["token"] = provider["token"]
+    elif auth_method == "basic" and "username" in provider and "password" in provider:
+        auth = (provider["username"], provider["password"])
+    elif auth_method == "bearer" and "token" in provider:
+        headers["Authorization"] = f"Bearer {provider['token']}"
+    else:
+        raise ValueError("Invalid or incomplete auth configuration")
+    return url, params, auth, headers
+
+def update_dyndns2(provider, ip, ip6=None, request=None):
     """
     Updates a DynDNS2-compatible service.
     Returns "updated", "nochg", or None on error.
     Now supports extra_params for services like OVH.
+    request is the prebuilt result of _dyndns2_request(provider).
     """
     try:
-        # Prepare URL and auth
-        url = provider.get("url")
-        params = {}
-        
-        # Determine hostname parameter (some providers use different names)
-        hostname_param = None
-        if "hostname" in provider:
-            hostname_param = provider["hostname"]
-        elif "domain" in provider:
-            hostname_param = provider["domain"]
-        elif "host" in provider:
-            hostname_param = provider["host"]
-            
-        if not hostname_param:
-            log(f"No hostname/domain/host specified in provider {provider.get('name')}", "ERROR", section="DYNDNS2")
+        try:
+            url, static_params, auth, headers = request or _dyndns2_request(provider)
+        except ValueError as e:
+            log(f"{e} in provider {provider.get('name')}", "ERROR", section="DYNDNS2")
             return None
-            
-        # Set basic parameters
-        params["hostname"] = hostname_param
+        
+        # IP parameters first: extra_params may override them, as before
+        params = {}
         if ip:
             params["myip"] = ip
         if ip6:
             params["myipv6"] = ip6
-            
-        # Add extra parameters (new feature)
-        if "extra_params" in provider and isinstance(provider["extra_params"], dict):
-            extra_params = provider["extra_params"]
-            for key, value in extra_params.items():
-                params[key] = value
-                
-        # Authentication
-        auth = None
-        headers = {}
-        auth_method = provider.get("auth_method", "token")
-        
-        if auth_method == "token" and "token" in provider:
-            params["hostname"] = f"{hostname_param}"
-            params["token"] = provider["token"]
-        elif auth_method == "basic" and "username" in provider and "password" in provider:
-            auth = (provider["username"], provider["password"])
-        elif auth_method == "bearer" and "token" in provider:
-            headers["Authorization"] = f"Bearer {provider['token']}"
-        else:
-            log(f"Invalid or incomplete auth configuration in provider {provider.get('name')}", "ERROR", section="DYNDNS2")
-            return None
+        params.update(static_params)
             
         # Make the request
-        response = requests.get(url, params=params, auth=auth, headers=headers, timeout=10)
+        response = get_session().get(url, params=params, auth=auth, headers=headers, timeout=10)
         response_text = response.text.strip()
         
         # Log the response for debugging
@@ -645,10 +1117,11 @@ def update_dyndns2(provider, ip, ip6=None):
         log(f"[{provider_name}] response: {response_text}", "INFO", section="DYNDNS2")
         
         # Check for success or no change
-        if "good" in response_text or "updated" in response_text or "update succeed" in response_text or "success" in response_text:
+        kinds = _response_kinds(_DYNDNS2_RESULT_RE, response_text)
+        if "ok" in kinds:
             return "updated"
-        elif "nochg" in response_text or "nochange" in response_text:
-            log(f"[{provider_name}] No update needed (nochg).", "TRACE", section="DYNDNS2")
+        elif "nochg" in kinds:
+            log_lazy("TRACE", "DYNDNS2", "[%s] No update needed (nochg).", provider_name)
             return "nochg"
         else:
             log(f"[{provider_name}] update failed: {response_text}", "ERROR", section="DYNDNS2")
@@ -658,15 +1131,54 @@ def update_dyndns2(provider, ip, ip6=None):
         log(f"Error in DynDNS2 update: {e}", "ERROR", section="DYNDNS2")
         return None
 
+_CONFIG_CACHE = {}
+
+def load_config(config_path):
+    """
+    Parses config.yaml with the libyaml loader when available.
+    The parsed result is cached per file and reused while mtime, size and inode are unchanged,
+    or when a changed mtime comes with byte-identical content (e.g. after a touch).
+    """
+    st = os.stat(config_path)
+    key = _stat_signature(st)
+    cached = _CONFIG_CACHE.get(config_path)
+    if cached is not None and cached[0] == key:
+        return cached[2]
+    with open(config_path, 'rb') as f:
+        data = f.read()
+    digest = hashlib.blake2b(data, digest_size=16).digest()
+    if cached is not None and cached[1] == digest:
+        config = cached[2]
+    else:
+        config = yaml.load(data, Loader=_YamlLoader)
+    _CONFIG_CACHE[config_path] = (key, digest, config)
+    return config
+
+# Allowed values for validate_config, built once (tuples keep the order of the messages)
+_REQUIRED_TOP_KEYS = ("timer", "providers")
+_ALLOWED_PROTOCOLS = ("cloudflare", "ipv64", "dyndns2")
+_ALLOWED_PROTOCOLS_SET = frozenset(_ALLOWED_PROTOCOLS)
+_ALLOWED_PROTOCOLS_STR = ", ".join(_ALLOWED_PROTOCOLS)
+_VALID_LEVELS = ("TRACE", "DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+_VALID_LEVELS_SET = frozenset(_VALID_LEVELS)
+_VALID_LEVELS_STR = ", ".join(_VALID_LEVELS)
+_VALID_LOGGING_KEYS = frozenset(("enabled", "file", "max_size_mb", "backup_count"))
+
+def _is_one_of(value, allowed):
+    """
+    Set membership test; unhashable YAML values (lists, dicts) count as not allowed.
+    """
+    try:
+        return value in allowed
+    except TypeError:
+        return False
+
 def validate_config(config):
     """
     Checks config.yaml for required fields and prints errors with line numbers.
     Returns True if everything is fine, otherwise False.
     """
-    required_top = ["timer", "providers"]
-    allowed_protocols = ("cloudflare", "ipv64", "dyndns2")
-    
-    for key in required_top:
+    for key in _REQUIRED_TOP_KEYS:
         if key not in config:
             log(f"Missing key '{key}' in config.yaml.", "ERROR")
             return False
@@ -679,9 +1191,8 @@ def validate_config(config):
             return False
         
         # Check for valid logging options
-        valid_logging_keys = ["enabled", "file", "max_size_mb", "backup_count"]
         for key in logging_config:
-            if key not in valid_logging_keys:
+            if key not in _VALID_LOGGING_KEYS:
                 log(f"Unknown logging option '{key}' in config.yaml.", "WARNING")
         
         # Validate file path if logging is enabled
@@ -691,13 +1202,12 @@ def validate_config(config):
                 return False
     
     # Validate log levels
-    valid_levels = ["TRACE", "DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
-    if "consolelevel" in config and config["consolelevel"] not in valid_levels:
-        log(f"Invalid consolelevel '{config['consolelevel']}'. Valid options: {', '.join(valid_levels)}", "ERROR")
+    if "consolelevel" in config and not _is_one_of(config["consolelevel"], _VALID_LEVELS_SET):
+        log(f"Invalid consolelevel '{config['consolelevel']}'. Valid options: {_VALID_LEVELS_STR}", "ERROR")
         return False
     
-    if "loglevel" in config and config["loglevel"] not in valid_levels:
-        log(f"Invalid loglevel '{config['loglevel']}'. Valid options: {', '.join(valid_levels)}", "ERROR")
+    if "loglevel" in config and not _is_one_of(config["loglevel"], _VALID_LEVELS_SET):
+        log(f"Invalid loglevel '{config['loglevel']}'. Valid options: {_VALID_LEVELS_STR}", "ERROR")
         return False
     
     if not isinstance(config["providers"], list):
@@ -707,10 +1217,10 @@ def validate_config(config):
         if "protocol" not in provider:
             log(f"Missing field 'protocol' in provider #{idx+1} ({provider.get('name','?')}) in config.yaml.", "ERROR")
             return False
-        if provider["protocol"] not in allowed_protocols:
+        if not _is_one_of(provider["protocol"], _ALLOWED_PROTOCOLS_SET):
             log(
                 f"Invalid field 'protocol' ('{provider['protocol']}') in provider #{idx+1} ({provider.get('name','?')}) in config.yaml. "
-                f"Allowed: {', '.join(allowed_protocols)}.",
+                f"Allowed: {_ALLOWED_PROTOCOLS_STR}.",
                 "ERROR"
             )
             return False
@@ -727,18 +1237,32 @@ def validate_config(config):
 def _ip_cache_file(ip_version):
     return f"/tmp/last_ip_{ip_version}.txt"
 
+def canonical_ip(ip):
+    """
+    Returns the canonical text form of an IP address (e.g. 2001:db8::1 for
+    2001:0db8:0000::1), or the input unchanged if it is not a valid address.
+    """
+    try:
+        return ipaddress.ip_address(ip).compressed
+    except ValueError:
+        return ip
+
 def load_last_ip(ip_version):
     try:
         with open(_ip_cache_file(ip_version), "r") as f:
-            return f.read().strip()
+            return canonical_ip(f.read().strip())
     except FileNotFoundError:
         return None
 
 def save_last_ip(ip_version, ip):
+    # Write to a temp file and rename: a crash never leaves a truncated IP behind
+    path = _ip_cache_file(ip_version)
+    tmp_path = f"{path}.tmp"
     try:
-        with open(_ip_cache_file(ip_version), "w") as f:
+        with open(tmp_path, "w") as f:
             f.write(str(ip) if ip is not None else "")
-    except Exception as e:
+        os.replace(tmp_path, path)
+    except OSError as e:
         log(f"Error saving last IP ({ip_version}): {e}", "ERROR", section="MAIN")
 
 def update_provider(provider, ip, ip6=None, log_success_if_nochg=True, old_ip=None, old_ip6=None):
@@ -787,7 +1311,7 @@ def update_provider(provider, ip, ip6=None, log_success_if_nochg=True, old_ip=No
                 )
             elif result == "nochg":
                 if log_success_if_nochg:
-                    log(f"Provider '{provider_name}' was already up to date, no update performed.", "TRACE", section="CLOUDFLARE")
+                    log_lazy("TRACE", "CLOUDFLARE", "Provider '%s' was already up to date, no update performed.", provider_name)
             else:
                 error_msg = f"Provider '{provider_name}' update failed. See previous log for details."
                 log(error_msg, "ERROR", section="CLOUDFLARE")
@@ -816,7 +1340,7 @@ def update_provider(provider, ip, ip6=None, log_success_if_nochg=True, old_ip=No
                 )
             elif result == "nochg":
                 if log_success_if_nochg:
-                    log(f"Provider '{provider_name}' was already up to date, no update performed.", "TRACE", section="IPV64")
+                    log_lazy("TRACE", "IPV64", "Provider '%s' was already up to date, no update performed.", provider_name)
             else:
                 error_msg = f"Provider '{provider_name}' update failed. See previous log for details."
                 log(error_msg, "ERROR", section="IPV64")
@@ -845,7 +1369,7 @@ def update_provider(provider, ip, ip6=None, log_success_if_nochg=True, old_ip=No
                 )
             elif result == "nochg":
                 if log_success_if_nochg:
-                    log(f"Provider '{provider_name}' was already up to date, no update performed.", "TRACE", section="DYNDNS2")
+                    log_lazy("TRACE", "DYNDNS2", "Provider '%s' was already up to date, no update performed.", provider_name)
             else:
                 error_msg = f"Provider '{provider_name}' update failed. See previous log for details."
                 log(error_msg, "ERROR", section="DYNDNS2")
@@ -875,116 +1399,182 @@ def update_provider(provider, ip, ip6=None, log_success_if_nochg=True, old_ip=No
             
         return
 
+# Upper bound for parallel provider updates (each update is network-bound);
+# stays below the session's pool_maxsize so no pooled connection is discarded
+MAX_PARALLEL_UPDATES = 16
+
+def update_all_providers(providers, ip, ip6=None):
+    """
+    Runs update_provider for all given providers concurrently.
+    Provider updates are independent and spend their time waiting on HTTP,
+    so the total duration is roughly that of the slowest provider.
+    Returns a list of (provider, result) tuples in the order of the input list.
+    An exception in one provider is logged and reported as False for that
+    provider only, so it cannot abort the updates of the others.
+    """
+    providers = list(providers)
+
+    def run(provider):
+        try:
+            return update_provider(provider, ip, ip6)
+        except Exception as e:
+            log(f"Unexpected error while updating provider '{provider.get('name', 'unknown')}': {e}", "ERROR", section="MAIN")
+            return False
+
+    if len(providers) <= 1:
+        return [(provider, run(provider)) for provider in providers]
+
+    # Optional limit from the config, e.g. for providers with strict rate limits
+    limit = MAX_PARALLEL_UPDATES
+    if state.config:
+        try:
+            limit = max(1, min(int(state.config.get('max_parallel_updates', limit)), MAX_PARALLEL_UPDATES))
+        except (TypeError, ValueError):
+            pass
+
+    with ThreadPoolExecutor(max_workers=min(limit, len(providers))) as executor:
+        results = list(executor.map(run, providers))
+    return list(zip(providers, results))
+
+def select_due_providers(providers, retry_providers, ip_changed, known_providers=None):
+    """
+    Returns the providers that need an update run.
+    With an unchanged IP only previously failed providers are due, plus - when
+    known_providers is given - providers that are new or whose configuration
+    changed; everything else can skip its HTTP round trips entirely.
+    """
+    if ip_changed:
+        return list(providers)
+    # Within one config the failed providers are the same objects: identity lookup in O(1)
+    retry_ids = {id(p) for p in retry_providers}
+    if known_providers is None:
+        return [p for p in providers if id(p) in retry_ids]
+    # After a reload the previous lists hold the old config dicts: compare by content
+    return [p for p in providers
+            if id(p) in retry_ids or p in retry_providers or p not in known_providers]
+
 def get_interface_ipv4(interface_name):
     """
     Gets the IPv4 address from the specified network interface.
+    Asks the kernel directly (SIOCGIFADDR); no hostname/DNS lookup involved.
     """
-    log(f"Attempting to get IPv4 from interface '{interface_name}'", "DEBUG", section="INTERFACE")
+    log_lazy("DEBUG", "INTERFACE", "Attempting to get IPv4 from interface '%s'", interface_name)
+    if not fcntl:  # Only use fcntl on Linux/Unix systems
+        log("Interface lookup requires fcntl (Linux/Unix)", "WARNING", section="INTERFACE")
+        return None
     try:
-        # Try using socket library directly (works on Linux)
         sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        # 0x8915 is SIOCGIFADDR in Linux
-        ifreq = struct.pack('256s', interface_name[:15].encode('utf-8'))
         try:
-            if fcntl:  # Only use fcntl on Linux/Unix systems
-                info = fcntl.ioctl(sock.fileno(), 0x8915, ifreq)
-                ip = socket.inet_ntoa(info[20:24])
-                if validate_ipv4(ip):
-                    log(f"Found IPv4 address {ip} on interface '{interface_name}'", "INFO", section="INTERFACE")
-                    return ip
-        except OSError:
-            pass  # Fall through to alternative method
-        
-        # Alternative method: Check all interfaces
-        for addr_info in socket.getaddrinfo(socket.gethostname(), None):
-            if addr_info[0] == socket.AF_INET:  # IPv4
-                ip = addr_info[4][0]
-                if validate_ipv4(ip) and ip != '127.0.0.1':
-                    # Try to verify this belongs to our interface
-                    try:
-                        with open(f"/sys/class/net/{interface_name}/address") as f:
-                            # Interface exists
-                            log(f"Found IPv4 address {ip} that might be on interface '{interface_name}'", "INFO", section="INTERFACE")
-                            return ip
-                    except:
-                        pass
-
+            # 0x8915 is SIOCGIFADDR in Linux; struct ifreq is a 16-byte name plus a 24-byte union
+            ifreq = struct.pack('16s24x', interface_name[:15].encode('utf-8'))
+            info = fcntl.ioctl(sock.fileno(), 0x8915, ifreq)
+        finally:
+            sock.close()
+        ip = socket.inet_ntoa(info[20:24])
+        if validate_ipv4(ip):
+            log(f"Found IPv4 address {ip} on interface '{interface_name}'", "INFO", section="INTERFACE")
+            return ip
         log(f"No IPv4 address found for interface '{interface_name}'", "WARNING", section="INTERFACE")
         return None
-    except Exception as e:
+    except OSError as e:
+        log(f"No IPv4 address found for interface '{interface_name}': {e}", "WARNING", section="INTERFACE")
+        return None
+    except (ValueError, TypeError, AttributeError) as e:
+        # Malformed interface names (embedded NUL, non-string values)
         log(f"Error getting IPv4 address from interface '{interface_name}': {e}", "ERROR", section="INTERFACE")
         return None
 
 def get_interface_ipv6(interface_name):
     """
     Gets the IPv6 address from the specified network interface using Python standard library.
-    No external commands required.
+    Reads /proc/net/if_inet6, which lists every address with its interface and scope,
+    so no external commands and no hostname/DNS lookup are required.
     """
     try:
-        # Check if interface exists
-        try:
-            with open(f"/sys/class/net/{interface_name}/address"):
-                pass  # Interface exists
-        except FileNotFoundError:
-            log(f"Interface '{interface_name}' not found", "ERROR", section="INTERFACE")
-            return None
-            
-        # Get all IPv6 addresses
-        for addr_info in socket.getaddrinfo(socket.gethostname(), None):
-            if addr_info[0] == socket.AF_INET6:  # IPv6
-                ip = addr_info[4][0]
-                # Remove scope ID if present
-                if '%' in ip:
-                    ip = ip.split('%')[0]
-                
-                # Skip link-local addresses
-                if ip.startswith('fe80:'):
+        found_interface = False
+        with _open("/proc/net/if_inet6") as f:
+            # Format: address(hex) ifindex prefix_len scope flags ifname
+            for line in f:
+                fields = line.split()
+                if len(fields) < 6 or fields[5] != interface_name:
                     continue
-                    
+                found_interface = True
+                # Skip link-local and other non-global scopes
+                if fields[3] != "00":
+                    continue
+                ip = str(ipaddress.IPv6Address(bytes.fromhex(fields[0])))
                 if validate_ipv6(ip):
-                    log(f"Found IPv6 address {ip} that might be on interface '{interface_name}'", "INFO", section="INTERFACE")
+                    log(f"Found IPv6 address {ip} on interface '{interface_name}'", "INFO", section="INTERFACE")
                     return ip
-        
+
+        if not found_interface:
+            log(f"Interface '{interface_name}' not found", "ERROR", section="INTERFACE")
+            return None
         log(f"No valid public IPv6 address found on interface '{interface_name}'", "WARNING", section="INTERFACE")
         return None
-    except Exception as e:
+    except FileNotFoundError:
+        log(f"IPv6 not available (no /proc/net/if_inet6) for interface '{interface_name}'", "ERROR", section="INTERFACE")
+        return None
+    except (OSError, ValueError) as e:
+        # Unreadable procfs or a malformed if_inet6 line
         log(f"Error getting IPv6 address from interface '{interface_name}': {e}", "ERROR", section="INTERFACE")
         return None
 
 def validate_ipv4(ip):
     """
     Validates if the given string is a valid IPv4 address.
+    Four dot-separated decimal octets (0-255); leading zeros are accepted.
     """
+    if not isinstance(ip, str):
+        return False
     try:
-        parts = ip.split('.')
-        if len(parts) != 4:
-            return False
-        for part in parts:
-            if not part.isdigit() or int(part) < 0 or int(part) > 255:
-                return False
+        # Fast path: canonical dotted-quad, parsed by libc
+        socket.inet_pton(socket.AF_INET, ip)
         return True
-    except:
+    except (OSError, ValueError):
+        pass
+    parts = ip.split('.')
+    if len(parts) != 4:
+        return False
+    try:
+        return all(part.isdigit() and int(part) <= 255 for part in parts)
+    except ValueError:
         return False
 
 def validate_ipv6(ip):
     """
     Validates if the given string is a valid IPv6 address.
-    More strict checking to prevent IPv4 addresses being accepted.
+    More strict checking to prevent IPv4 addresses being accepted:
+    dotted notation is only allowed in the IPv4-mapped form (::ffff:a.b.c.d).
     """
+    if not isinstance(ip, str) or ':' not in ip:
+        return False
+    if '.' in ip and not ip.startswith('::ffff:'):
+        return False
     try:
-        # Quick check: IPv6 address must contain at least one colon
-        if ':' not in ip:
-            return False
-            
-        # If it contains a dot, it might be an IPv4-mapped IPv6 address
-        if '.' in ip and not ip.startswith('::ffff:'):
-            return False
-            
         socket.inet_pton(socket.AF_INET6, ip)
         return True
-    except:
+    except (OSError, ValueError):
         return False
 
+# Number of IP echo services queried concurrently by IPResolver
+IP_SERVICE_RACE_WIDTH = 3
+
+# Fallback echo services used when no ip_services/ip6_services list is configured
+_IPV4_FALLBACK_SERVICES = (
+    "https://ifconfig.me/ip",
+    "https://icanhazip.com",
+    "https://checkip.amazonaws.com",
+    "https://ipecho.net/plain",
+    "https://myexternalip.com/raw",
+)
+_IPV6_FALLBACK_SERVICES = (
+    "https://ifconfig.me/ip",
+    "https://icanhazip.com",
+    "https://v6.ident.me",
+    "https://ipv6.icanhazip.com",
+)
+
 class IPResolver:
     """Unified IP resolution for IPv4 and IPv6 - eliminiert massive Duplikation."""
     
@@ -1013,22 +1603,14 @@ class IPResolver:
         
         log(f"Versuche {ip_version.upper()}-Ermittlung über {len(services)} Services...", "INFO", "NETWORK")
         
-        # Try external services
-        for i, service in enumerate(services, 1):
-            try:
-                log(f"{ip_version.upper()} Versuch {i}/{len(services)}: {service}", "DEBUG", "NETWORK")
-                
-                ip = fetcher(service)
-                
-                if ip and validator(ip):
-                    log(f"{ip_version.upper()} erfolgreich ermittelt von {service}: {ip}", "INFO", "NETWORK")
-                    return ip
-                else:
-                    log(f"⚠️ Ungültige {ip_version.upper()} von {service}: {ip}", "WARNING", "NETWORK")
-                    
-            except Exception as e:
-                log(f"❌ {ip_version.upper()} Service {service} fehlgeschlagen: {str(e)}", "WARNING", "NETWORK")
-                continue
+        # Try external services - several at once, the first valid answer wins
+        for start in range(0, len(services), IP_SERVICE_RACE_WIDTH):
+            batch = services[start:start + IP_SERVICE_RACE_WIDTH]
+            if log_enabled("DEBUG"):
+                log(f"{ip_version.upper()} Versuch {start + 1}-{start + len(batch)}/{len(services)}: {', '.join(batch)}", "DEBUG", "NETWORK")
+            ip = self._race_services(batch, fetcher, validator, ip_version)
+            if ip:
+                return ip
         
         # Fallback to interface if enabled
         if self.config.get('enable_interface_fallback', True):
@@ -1041,39 +1623,40 @@ class IPResolver:
         log(f"❌ Alle {ip_version.upper()}-Services fehlgeschlagen", "ERROR", "NETWORK")
         return None
     
+    def _race_services(self, services, fetcher, validator, ip_version):
+        """Fragt mehrere Services gleichzeitig ab und liefert die erste gültige Antwort."""
+        executor = ThreadPoolExecutor(max_workers=len(services))
+        futures = {executor.submit(fetcher, service): service for service in services}
+        try:
+            for future in as_completed(futures):
+                service = futures[future]
+                try:
+                    ip = future.result()
+                except Exception as e:
+                    log(f"❌ {ip_version.upper()} Service {service} fehlgeschlagen: {str(e)}", "WARNING", "NETWORK")
+                    continue
+                if ip and validator(ip):
+                    log(f"{ip_version.upper()} erfolgreich ermittelt von {service}: {ip}", "INFO", "NETWORK")
+                    return ip
+                log(f"⚠️ Ungültige {ip_version.upper()} von {service}: {ip}", "WARNING", "NETWORK")
+            return None
+        finally:
+            # Langsamere Services nicht abwarten
+            executor.shutdown(wait=False, cancel_futures=True)
+    
     def _get_services(self, ip_version):
         """Get service list for IP version - eliminiert Service-Listen-Duplikation."""
         if ip_version == 'ipv4':
             services = self.config.get('ip_services', [])
             if not services:
-                primary_service = self.config.get('ip_service', 'https://api.ipify.org')
-                fallback_services = [
-                    "https://ifconfig.me/ip",
-                    "https://icanhazip.com",
-                    "https://checkip.amazonaws.com",
-                    "https://ipecho.net/plain",
-                    "https://myexternalip.com/raw"
-                ]
-                services = [primary_service] + fallback_services
+                services = (self.config.get('ip_service', 'https://api.ipify.org'),) + _IPV4_FALLBACK_SERVICES
         else:  # ipv6
             services = self.config.get('ip6_services', [])
             if not services:
-                primary_service = self.config.get('ip6_service', 'https://api64.ipify.org')
-                fallback_services = [
-                    "https://ifconfig.me/ip",
-                    "https://icanhazip.com",
-                    "https://v6.ident.me",
-                    "https://ipv6.icanhazip.com"
-                ]
-                services = [primary_service] + fallback_services
+                services = (self.config.get('ip6_service', 'https://api64.ipify.org'),) + _IPV6_FALLBACK_SERVICES
         
-        # Add fallback services if not already included
-        unique_services = []
-        for service in services:
-            if service not in unique_services:
-                unique_services.append(service)
-        
-        return unique_services
+        # Duplikate entfernen, Reihenfolge beibehalten
+        return list(dict.fromkeys(services))
     
     def _get_interface_ip(self, ip_version):
         """Get IP from network interface - eliminiert Interface-Fallback-Duplikation."""
@@ -1081,7 +1664,7 @@ class IPResolver:
         interface = self.config.get(interface_key)
         
         if not interface:
-            log(f"Kein {interface_key} konfiguriert", "DEBUG", "NETWORK")
+            log_lazy("DEBUG", "NETWORK", "Kein %s konfiguriert", interface_key)
             return None
         
         log(f"Verwende Interface-Fallback für {ip_version.upper()}: {interface}", "INFO", "NETWORK")
@@ -1126,6 +1709,105 @@ def get_current_ipv6_resilient(config):
     resolver = IPResolver(config)
     return resolver.get_ip_with_fallback('ipv6')
 
+def get_ip_sources(config):
+    """
+    Returns (ip_service, ip_interface, ip6_service, ip6_interface) from the config.
+    If only ip_services / ip6_services lists are given, their first entry is the primary service.
+    """
+    ip_service = config.get('ip_service') or (config.get('ip_services') or [None])[0]
+    ip6_service = config.get('ip6_service') or (config.get('ip6_services') or [None])[0]
+    return ip_service, config.get('interface'), ip6_service, config.get('interface6')
+
+# Phases of main() that look up the current IPs; each keeps its own fallback rules
+IP_PHASE_STARTUP = "startup"
+IP_PHASE_RELOAD = "reload"
+IP_PHASE_TIMER = "timer"
+
+def _detect_ipv4(config, ip_service, ip_interface, phase=IP_PHASE_TIMER):
+    """
+    Determines the current IPv4 via the configured service or interface.
+    Startup uses the configured source only. A config reload falls back to the
+    resilient resolver on any failure or when nothing is configured; the timer
+    only when the service fails.
+    """
+    if phase == IP_PHASE_STARTUP:
+        if ip_service:
+            return get_public_ip(ip_service)
+        if ip_interface:
+            return get_interface_ipv4(ip_interface)
+        return None
+    if ip_service:
+        try:
+            return get_public_ip(ip_service)
+        except Exception as e:
+            log(f"❌ IP-Service Fehler: {e}", "ERROR", "NETWORK")
+            return get_current_ip_resilient(config)
+    if ip_interface:
+        try:
+            return get_interface_ipv4(ip_interface)
+        except Exception as e:
+            log(f"❌ Interface Fehler: {e}", "ERROR", "NETWORK")
+            return get_current_ip_resilient(config) if phase == IP_PHASE_RELOAD else None
+    # Kein Service/Interface konfiguriert
+    return get_current_ip_resilient(config) if phase == IP_PHASE_RELOAD else None
+
+def _detect_ipv6(config, ip6_service, ip6_interface, phase=IP_PHASE_TIMER):
+    """
+    Determines the current IPv6 via the configured services or interface, if any.
+    Startup asks the primary service only; later phases use all configured services.
+    """
+    if phase == IP_PHASE_STARTUP:
+        if ip6_service:
+            return get_public_ipv6(ip6_service)
+        if ip6_interface:
+            return get_interface_ipv6(ip6_interface)
+        return None
+    if ip6_service:
+        try:
+            return get_current_ipv6_resilient(config)
+        except Exception as e:
+            log(f"IPv6 Resilient Service Fehler: {e}", "WARNING", "NETWORK")
+    elif ip6_interface:
+        try:
+            return get_interface_ipv6(ip6_interface)
+        except Exception as e:
+            log(f"IPv6 Interface Fehler: {e}", "WARNING", "NETWORK")
+    return None
+
+def fetch_current_ips(config, ip_service, ip_interface, ip6_service, ip6_interface, phase=IP_PHASE_TIMER):
+    """
+    Returns (ipv4, ipv6) from the sources returned by get_ip_sources. Both lookups
+    run concurrently when IPv6 is configured, so a slow IPv4 service no longer
+    delays the IPv6 lookup.
+    """
+    if not (ip6_service or ip6_interface):
+        return _detect_ipv4(config, ip_service, ip_interface, phase), None
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        future_v4 = pool.submit(_detect_ipv4, config, ip_service, ip_interface, phase)
+        future_v6 = pool.submit(_detect_ipv6, config, ip6_service, ip6_interface, phase)
+        return future_v4.result(), future_v6.result()
+
+def fetch_resilient_ips(config, with_ipv6):
+    """
+    Returns (ipv4, ipv6) via the resilient resolvers (all services plus interface fallback).
+    Both lookups run concurrently; ipv6 is None when with_ipv6 is false.
+    """
+    if not with_ipv6:
+        return get_current_ip_resilient(config), None
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        future_v4 = pool.submit(get_current_ip_resilient, config)
+        future_v6 = pool.submit(get_current_ipv6_resilient, config)
+        return future_v4.result(), future_v6.result()
+
+def fetch_ips(config, resilient, ip_service, ip_interface, ip6_service, ip6_interface, phase=IP_PHASE_TIMER):
+    """
+    Returns (ipv4, ipv6) for the main loop: the resilient resolvers while
+    resilient mode is active, otherwise the configured sources.
+    """
+    if resilient:
+        return fetch_resilient_ips(config, bool(ip6_service or ip6_interface))
+    return fetch_current_ips(config, ip_service, ip_interface, ip6_service, ip6_interface, phase)
+
 def handle_no_ip_available(consecutive_failures, config):
     """
     Behandelt den Fall, dass keine IP ermittelt werden konnte
@@ -1147,21 +1829,158 @@ def handle_no_ip_available(consecutive_failures, config):
     
     if consecutive_failures <= max_failures_before_backoff:
         wait_time = base_wait_time
+        # Ausgangspunkt für den Backoff einer neuen Fehlerserie
+        state.backoff_delay = base_wait_time
         log(f"⚠️ Keine IP verfügbar (Fehler #{consecutive_failures}). Warte {wait_time}s...", 
             "WARNING", "NETWORK")
     else:
-        # Exponential Backoff: 60s, 120s, 240s, max 600s (10 Min)
+        # Decorrelated Jitter: zufällig zwischen Basis und 1,5 × Multiplikator × letzter Wartezeit
+        # (beim Standard 2.0 also bis 3×), höchstens max_wait_time (Standard 600s).
+        # Nach einem gemeinsamen Ausfall melden sich so nicht alle Clients gleichzeitig zurück.
         backoff_multiplier = config.get('backoff_multiplier', 2.0)
         max_wait_time = config.get('max_wait_time', 600)
         
-        backoff_factor = min(consecutive_failures - max_failures_before_backoff, 4)
-        wait_time = min(base_wait_time * (backoff_multiplier ** backoff_factor), max_wait_time)
+        upper = max(base_wait_time, state.backoff_delay * backoff_multiplier * 1.5)
+        wait_time = round(min(max_wait_time, random.uniform(base_wait_time, upper)), 1)
+        state.backoff_delay = wait_time
         
         log(f"⚠️ Anhaltende Netzwerkprobleme (Fehler #{consecutive_failures}). "
             f"Exponential Backoff: Warte {wait_time}s...", "WARNING", "NETWORK")
     
     return consecutive_failures, wait_time
 
+# =============================================================================
+# CONFIG WATCHER
+# =============================================================================
+
+# Set by the config watcher when config.yaml changes; main() waits on it
+config_changed = threading.Event()
+
+# Set by SIGHUP: reload config.yaml even if its mtime is unchanged
+reload_requested = threading.Event()
+
+def _request_reload(signum, frame):
+    reload_requested.set()
+    config_changed.set()
+
+# inotify event masks (linux/inotify.h)
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_INOTIFY_EVENT = struct.Struct('iIII')
+
+def _open_inotify(directory):
+    """
+    Returns an inotify descriptor watching directory, or None if inotify is unavailable.
+    The directory is watched instead of the file to catch atomic-rename saves.
+    """
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        fd = libc.inotify_init1(os.O_CLOEXEC)
+    except (OSError, AttributeError, TypeError):
+        return None
+    if fd < 0:
+        return None
+    mask = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+    if libc.inotify_add_watch(fd, os.fsencode(directory), mask) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+def _inotify_names(data):
+    """
+    Yields the file names contained in a buffer of inotify events.
+    """
+    offset = 0
+    while offset + _INOTIFY_EVENT.size <= len(data):
+        name_len = _INOTIFY_EVENT.unpack_from(data, offset)[3]
+        offset += _INOTIFY_EVENT.size
+        yield data[offset:offset + name_len].rstrip(b"\0")
+        offset += name_len
+
+# Upper bound in seconds between main-loop stat() checks of config.yaml,
+# a safety net for mounts where inotify events never arrive
+CONFIG_STAT_INTERVAL = 30
+
+def _stat_signature(st):
+    """
+    Change signature of a stat result. The inode catches atomic replaces
+    (write temp file + rename) even when mtime and size happen to match.
+    """
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+def _config_signature(config_path):
+    try:
+        return _stat_signature(os.stat(config_path))
+    except OSError:
+        return None
+
+class ConfigWatcher:
+    """
+    Überwacht config.yaml in einem Hintergrund-Thread und setzt ein Event bei Änderungen.
+    Nutzt inotify (Linux) und fällt sonst auf stat()-Polling zurück.
+    """
+
+    def __init__(self, config_path, event, poll_interval=2):
+        self.config_path = config_path
+        self.event = event
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._inotify_fd = None
+        self._wake_fds = None
+        self._last_sig = None
+
+    @property
+    def uses_inotify(self):
+        return self._inotify_fd is not None
+
+    def start(self):
+        """Startet den Watcher-Thread (inotify wenn möglich, sonst Polling)."""
+        self._inotify_fd = _open_inotify(os.path.dirname(os.path.abspath(self.config_path)))
+        if self._inotify_fd is not None:
+            # Pipe, um den blockierenden select() beim Stoppen aufzuwecken
+            self._wake_fds = os.pipe()
+            target = self._watch_inotify
+        else:
+            self._last_sig = _config_signature(self.config_path)
+            target = self._watch_stat
+        self._thread = threading.Thread(target=target, name="config-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Beendet den Watcher-Thread und schließt alle Deskriptoren."""
+        self._stop.set()
+        if self._wake_fds is not None:
+            os.write(self._wake_fds[1], b"\0")
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        for fd in (self._inotify_fd, *(self._wake_fds or ())):
+            if fd is not None:
+                os.close(fd)
+        self._inotify_fd = None
+        self._wake_fds = None
+
+    def _watch_inotify(self):
+        filename = os.fsencode(os.path.basename(self.config_path))
+        while not self._stop.is_set():
+            readable, _, _ = select.select([self._inotify_fd, self._wake_fds[0]], [], [])
+            if self._inotify_fd not in readable:
+                continue
+            data = os.read(self._inotify_fd, 4096)
+            if filename in _inotify_names(data):
+                self.event.set()
+
+    def _watch_stat(self):
+        while not self._stop.wait(self.poll_interval):
+            current_sig = _config_signature(self.config_path)
+            if current_sig != self._last_sig:
+                self._last_sig = current_sig
+                self.event.set()
+
 def main():
     global config, log_level, console_level
     
@@ -1169,7 +1988,9 @@ def main():
     state.config = None
     
     config_path = 'config/config.yaml'
-    if not os.path.exists(config_path):
+    try:
+        last_config_sig = _stat_signature(os.stat(config_path))
+    except FileNotFoundError:
         setup_logging("INFO")
         log("config/config.yaml not found! Please provide your own configuration or copy config.example.yaml.\n"
             "See instructions in the repository: https://github.com/alex-1987/dyndns-docker-client\n"
@@ -1180,14 +2001,13 @@ def main():
             "CRITICAL"
         )
         sys.exit(1)
-    with open(config_path, 'r') as f:
-        try:
-            config = yaml.safe_load(f)
-            state.config = config  # Update state
-        except Exception as e:
-            setup_logging("INFO")
-            log(f"Error loading config.yaml: {e}", "ERROR")
-            sys.exit(1)
+    try:
+        config = load_config(config_path)
+        state.config = config  # Update state
+    except Exception as e:
+        setup_logging("INFO")
+        log(f"Error loading config.yaml: {e}", "ERROR")
+        sys.exit(1)
     loglevel = config.get("loglevel", "INFO")
     consolelevel = config.get("consolelevel", loglevel)
     
@@ -1197,14 +2017,13 @@ def main():
     # Then update both state and global variables for backward compatibility
     log_level = loglevel
     console_level = consolelevel
-    state.log_level = loglevel
-    state.console_level = consolelevel
+    state.update(log_level=loglevel, console_level=consolelevel)
     
     # Test debug logging immediately after setup
     log(f"Logging system initialized: file_level='{loglevel}', console_level='{consolelevel}'", "DEBUG", "LOGGING")
     log("Testing DEBUG level logging - this message should appear if consolelevel is DEBUG", "DEBUG", "LOGGING")
+    start_notification_worker()
     
-    last_config_mtime = os.path.getmtime(config_path)
     if not config or not isinstance(config, dict):
         log(
             "config.yaml is empty or invalid! Please check the file and refer to config.example.yaml.\n"
@@ -1223,23 +2042,12 @@ def main():
         log("Configuration invalid. Program will exit.", "CRITICAL")
         sys.exit(1)
     timer = config.get('timer', 300)
-    providers = config['providers']
+    providers = prepare_providers(config['providers'])
 
     # Get IP configuration method - support both singular and plural forms
-    ip_service = config.get('ip_service', None)
+    ip_service, ip_interface, ip6_service, ip6_interface = get_ip_sources(config)
     ip_services = config.get('ip_services', [])
-    ip_interface = config.get('interface', None)
-    ip6_service = config.get('ip6_service', None)
     ip6_services = config.get('ip6_services', [])
-    ip6_interface = config.get('interface6', None)
-    
-    # If ip_services is provided but ip_service is not, use the first service from the list
-    if not ip_service and ip_services:
-        ip_service = ip_services[0]
-    
-    # If ip6_services is provided but ip6_service is not, use the first service from the list
-    if not ip6_service and ip6_services:
-        ip6_service = ip6_services[0]
     
     # Log the configuration
     if ip_service:
@@ -1259,19 +2067,9 @@ def main():
     elif ip6_interface:
         log(f"Using interface to determine IPv6: {ip6_interface}", section="MAIN")
     
-    # Get IPv4 address
-    test_ip = None
-    if ip_service:
-        test_ip = get_public_ip(ip_service)
-    elif ip_interface:
-        test_ip = get_interface_ipv4(ip_interface)
-        
-    # Get IPv6 address
-    test_ip6 = None
-    if ip6_service:
-        test_ip6 = get_public_ipv6(ip6_service)
-    elif ip6_interface:
-        test_ip6 = get_interface_ipv6(ip6_interface)
+    # Get IPv4 and IPv6 addresses
+    test_ip, test_ip6 = fetch_current_ips(config, ip_service, ip_interface, ip6_service, ip6_interface,
+                                          IP_PHASE_STARTUP)
     
     # Validate IPs and send notifications for invalid IPs
     if test_ip is not None and not validate_ipv4(test_ip):
@@ -1304,60 +2102,88 @@ def main():
     last_ip6 = load_last_ip("v6")
     ip_changed = (test_ip != last_ip) if test_ip else False
     ip6_changed = (test_ip6 != last_ip6) if test_ip6 else False
+    failed_providers = []
 
     if skip_on_startup and not ip_changed and not ip6_changed:
         log("IP has not changed since last run. No provider updates needed on startup.", "TRACE", section="MAIN")
-        # IPs trotzdem speichern, falls sie vorher noch nicht gespeichert waren
-        save_last_ip("v4", test_ip)
-        save_last_ip("v6", test_ip6)
-        last_ip = test_ip
-        last_ip6 = test_ip6
-        # Update state
-        state.last_ipv4 = test_ip
-        state.last_ipv6 = test_ip6
     else:
         log("Starting initial update run for all providers...", section="MAIN")
-        failed_providers = []
-        state.failed_providers = []
-        for provider in providers:
-            result = update_provider(provider, test_ip, test_ip6)
-            section = provider.get('name', 'PROVIDER').upper()
+        state.failed_providers.clear()
+        for provider, result in update_all_providers(providers, test_ip, test_ip6):
             if not (result or result == "nochg"):
+                section = provider.get('name', 'PROVIDER').upper()
                 log(f"Provider '{provider.get('name')}' could not be updated initially.", "WARNING", section=section)
                 failed_providers.append(provider)
                 state.add_failed_provider(provider.get('name', 'unknown'))
+    # IPs nur speichern, wenn sie sich geändert haben (sonst kein Schreibzugriff)
+    if test_ip != last_ip:
         save_last_ip("v4", test_ip)
+    if test_ip6 != last_ip6:
         save_last_ip("v6", test_ip6)
-        last_ip = test_ip
-        last_ip6 = test_ip6
-        # Update state
-        state.last_ipv4 = test_ip
-        state.last_ipv6 = test_ip6
-        last_ip6 = test_ip6
+    last_ip = test_ip
+    last_ip6 = test_ip6
+    state.update(last_ipv4=test_ip, last_ipv6=test_ip6)
     # --- END PATCH ---
 
-    elapsed = 0
-    check_interval = 2  # Seconds, how often to check for config changes
+    timer_start = time.monotonic()  # Start of the current timer period
+    check_interval = 2  # Seconds between retries while the timer is already due
+
+    config_changed.clear()
+    watcher = ConfigWatcher(config_path, config_changed).start()
+    reload_requested.clear()
+    if hasattr(signal, "SIGHUP"):  # Windows has no SIGHUP
+        signal.signal(signal.SIGHUP, _request_reload)
+    log(f"Watching config.yaml for changes ({'inotify' if watcher.uses_inotify else 'polling'})", "DEBUG", section="MAIN")
 
-    log(f"Next run in {timer} seconds...", "DEBUG", section="MAIN")
+    log_lazy("DEBUG", "MAIN", "Next run in %s seconds...", timer)
+    # The polling watcher already stats the file in its own thread; only inotify,
+    # which can miss edits on some mounts, needs the main-loop safety net
+    stat_safety_net = watcher.uses_inotify
+    next_stat_at = (time.monotonic() + max(check_interval, min(timer, CONFIG_STAT_INTERVAL))
+                    if stat_safety_net else float("inf"))
 
     while True:
-        time.sleep(check_interval)
-        elapsed += check_interval
+        flush_file_log()
+        # Sleep until the timer is due, the next stat() check is due or the watcher reports a change
+        # (SIGHUP and the watcher thread both wake this single wait through config_changed)
+        remaining = timer_start + timer - time.monotonic()
+        timeout = remaining if remaining > 0 else check_interval
+        config_changed.wait(min(timeout, max(0, next_stat_at - time.monotonic())))
+        now = time.monotonic()
+        elapsed = now - timer_start
 
         # Check if config has changed
-        current_mtime = os.path.getmtime(config_path)
-        if current_mtime != last_config_mtime:
-            log("Change in config.yaml detected. Reloading configuration and starting a new run.", section="MAIN")
-            with open(config_path, 'r') as f:
-                try:
-                    config = yaml.safe_load(f)
-                    state.config = config  # Update state
-                except Exception as e:
-                    log(f"Error loading config.yaml after change: {e}\nPlease check the file and refer to config.example.yaml.", "ERROR")
-                    continue
+        current_sig = last_config_sig
+        if config_changed.is_set() or now >= next_stat_at:
+            config_changed.clear()
+            if stat_safety_net:
+                next_stat_at = now + max(check_interval, min(timer, CONFIG_STAT_INTERVAL))
+            sig = _config_signature(config_path)
+            if sig is not None:
+                current_sig = sig
+        force_reload = reload_requested.is_set()
+        reload_requested.clear()
+        if force_reload or current_sig != last_config_sig:
+            previous_config = config
+            try:
+                config = load_config(config_path)
+                state.config = config  # Update state
+            except Exception as e:
+                log(f"Error loading config.yaml after change: {e}\nPlease check the file and refer to config.example.yaml.", "ERROR")
+                continue
+            if config is previous_config and not force_reload:
+                # Only the stat signature changed (touch, editor save without edits)
+                log("config.yaml touched without content change - no reload needed.", "DEBUG", section="MAIN")
+                last_config_sig = current_sig
+                continue
+            if force_reload:
+                log("SIGHUP received. Reloading configuration and starting a new run.", section="MAIN")
+            else:
+                log("Change in config.yaml detected. Reloading configuration and starting a new run.", section="MAIN")
             if not validate_config(config):
                 log("Configuration invalid after change. Waiting for next change...", "ERROR")
+                # Keep running on the last valid config; a later touch must not count as "unchanged"
+                config = state.config = previous_config
                 continue
             
             # Reload logging configuration
@@ -1368,101 +2194,77 @@ def main():
                 # Update both state and global variables
                 log_level = new_loglevel
                 console_level = new_consolelevel
-                state.log_level = new_loglevel
-                state.console_level = new_consolelevel
+                state.update(log_level=new_loglevel, console_level=new_consolelevel)
                 setup_logging(new_loglevel, config)
             
             timer = config.get('timer', 300)
-            ip_service = config.get('ip_service', None)
-            ip_interface = config.get('interface', None)
-            ip6_service = config.get('ip6_service', None)
-            ip6_interface = config.get('interface6', None)
-            providers = config['providers']
-            last_config_mtime = current_mtime
+            ip_service, ip_interface, ip6_service, ip6_interface = get_ip_sources(config)
+            known_providers = providers
+            providers = prepare_providers(config['providers'])
+            # Re-resolve Cloudflare zone/record IDs once after every config change
+            _invalidate_cloudflare_ids()
+            last_config_sig = current_sig
             
             # Get current IPs using updated configuration with resilient handling
-            current_ip = None
-            if ip_service:
-                try:
-                    current_ip = get_public_ip(ip_service)
-                except Exception as e:
-                    log(f"❌ IP-Service Fehler nach Config-Reload: {e}", "ERROR", "NETWORK")
-                    current_ip = get_current_ip_resilient(config)
-            elif ip_interface:
-                try:
-                    current_ip = get_interface_ipv4(ip_interface)
-                except Exception as e:
-                    log(f"❌ Interface Fehler nach Config-Reload: {e}", "ERROR", "NETWORK")
-                    current_ip = get_current_ip_resilient(config)
-            else:
-                # Kein Service/Interface konfiguriert - verwende resiliente Methode
-                current_ip = get_current_ip_resilient(config)
-                
-            current_ip6 = None
-            if config.get('ip6_service') or config.get('ip6_services'):
-                try:
-                    current_ip6 = get_current_ipv6_resilient(config)
-                except Exception as e:
-                    log(f"IPv6 Resilient Service Fehler nach Config-Reload: {e}", "WARNING", "NETWORK")
-            elif ip6_interface:
-                try:
-                    current_ip6 = get_interface_ipv6(ip6_interface)
-                except Exception as e:
-                    log(f"IPv6 Interface Fehler nach Config-Reload: {e}", "WARNING", "NETWORK")
+            current_ip, current_ip6 = fetch_ips(config, resilient_mode or state.resilient_mode,
+                                                ip_service, ip_interface, ip6_service, ip6_interface,
+                                                IP_PHASE_RELOAD)
             if current_ip:
-                log(f"Current public IP: {current_ip}", "TRACE", section="MAIN")
+                log_lazy("TRACE", "MAIN", "Current public IP: %s", current_ip)
             if current_ip6:
-                log(f"Current public IPv6: {current_ip6}", "TRACE", section="MAIN")
+                log_lazy("TRACE", "MAIN", "Current public IPv6: %s", current_ip6)
+            # Unchanged providers with an unchanged IP do not need to contact their API again
+            ip_changed = (current_ip != last_ip) if current_ip is not None else False
+            ip6_changed = (current_ip6 != last_ip6) if current_ip6 is not None else False
+            due_providers = select_due_providers(providers, failed_providers, ip_changed or ip6_changed, known_providers)
+            if len(due_providers) < len(providers):
+                log_lazy("DEBUG", "MAIN", "IP unchanged - skipping %d unchanged provider(s) after config change.", len(providers) - len(due_providers))
             failed_providers = []
-            state.failed_providers = []
-            for provider in providers:
-                result = update_provider(provider, current_ip, current_ip6)
-                section = provider.get('name', 'PROVIDER').upper()
+            state.failed_providers.clear()
+            for provider, result in update_all_providers(due_providers, current_ip, current_ip6):
                 if not result:  # update_provider returns True for success (updated/nochg), False for failure
+                    section = provider.get('name', 'PROVIDER').upper()
                     log(f"Provider '{provider.get('name')}' could not be updated after config change.", "WARNING", section=section)
                     failed_providers.append(provider)
                     state.add_failed_provider(provider.get('name', 'unknown'))
+            # The cache files must follow last_ip, later writes only happen on a change
+            if ip_changed:
+                save_last_ip("v4", current_ip)
+            if ip6_changed:
+                save_last_ip("v6", current_ip6)
             last_ip = current_ip
             last_ip6 = current_ip6
             # Update state
-            state.last_ipv4 = current_ip
-            state.last_ipv6 = current_ip6
-            elapsed = 0
-            log(f"Next run in {timer} seconds...", "DEBUG", section="MAIN")
+            state.update(last_ipv4=current_ip, last_ipv6=current_ip6)
+            timer_start = time.monotonic()
+            log_lazy("DEBUG", "MAIN", "Next run in %s seconds...", timer)
             continue
 
         # Timer-based update with resilient network handling
         if elapsed >= timer:
-            if resilient_mode or state.resilient_mode:
-                # Verwende resiliente IP-Ermittlung
-                current_ip = get_current_ip_resilient(config)
-                
-                # IPv6 resilient 
-                current_ip6 = None
-                if config.get('ip6_service') or config.get('ip6_services') or config.get('interface6'):
-                    current_ip6 = get_current_ipv6_resilient(config)
-                        
+            in_resilient_mode = resilient_mode or state.resilient_mode
+            # IP sources are resolved once per config load by get_ip_sources
+            current_ip, current_ip6 = fetch_ips(config, in_resilient_mode,
+                                                ip_service, ip_interface, ip6_service, ip6_interface)
+            if in_resilient_mode:
                 if not current_ip and not current_ip6:
                     # Keine IP verfügbar - resiliente Behandlung
-                    if not hasattr(main, 'consecutive_failures'):
-                        main.consecutive_failures = 0
-                    
-                    main.consecutive_failures, wait_time = handle_no_ip_available(main.consecutive_failures, config)
+                    state.consecutive_failures, wait_time = handle_no_ip_available(state.consecutive_failures, config)
                     
                     log("🔄 Programm läuft weiter trotz Netzwerkproblemen...", "INFO", "MAIN")
                     
                     # Warte entsprechend der Backoff-Strategie
-                    elapsed = 0
+                    timer_start = time.monotonic()
                     # Überschreibe timer temporär für Backoff
                     original_timer = timer
                     timer = wait_time
-                    log(f"⏳ Nächster IP-Versuch in {timer} Sekunden...", "DEBUG", "MAIN")
+                    log_lazy("DEBUG", "MAIN", "⏳ Nächster IP-Versuch in %s Sekunden...", timer)
                     continue
                 else:
                     # IP erfolgreich ermittelt - Reset failure counter
-                    if hasattr(main, 'consecutive_failures') and main.consecutive_failures > 0:
-                        log(f"✅ Netzwerk wiederhergestellt nach {main.consecutive_failures} Fehlern", "INFO", "NETWORK")
-                        main.consecutive_failures = 0
+                    if state.consecutive_failures > 0:
+                        log(f"✅ Netzwerk wiederhergestellt nach {state.consecutive_failures} Fehlern", "INFO", "NETWORK")
+                        state.consecutive_failures = 0
                     
                     # Resilient mode deaktivieren wenn wir wieder IPs haben
                     resilient_mode = False
@@ -1471,34 +2273,6 @@ def main():
                     # Timer auf ursprünglichen Wert zurücksetzen
                     timer = config.get('timer', 300)
             else:
-                # Normale IP-Ermittlung
-                current_ip = None
-                if ip_service:
-                    try:
-                        current_ip = get_public_ip(ip_service)
-                    except Exception as e:
-                        log(f"❌ IP-Service Fehler: {e}", "ERROR", "NETWORK")
-                        # Versuche resiliente IP-Ermittlung, aber aktiviere resilient_mode noch nicht
-                        current_ip = get_current_ip_resilient(config)
-                elif ip_interface:
-                    try:
-                        current_ip = get_interface_ipv4(ip_interface)
-                    except Exception as e:
-                        log(f"❌ Interface Fehler: {e}", "ERROR", "NETWORK")
-                        current_ip = None
-                        
-                current_ip6 = None
-                if config.get('ip6_service') or config.get('ip6_services'):
-                    try:
-                        current_ip6 = get_current_ipv6_resilient(config)
-                    except Exception as e:
-                        log(f"IPv6 Resilient Service Fehler: {e}", "WARNING", "NETWORK")
-                elif ip6_interface:
-                    try:
-                        current_ip6 = get_interface_ipv6(ip6_interface)
-                    except Exception as e:
-                        log(f"IPv6 Interface Fehler: {e}", "WARNING", "NETWORK")
-                
                 # Fallback zu resilient mode wenn keine IP ermittelt werden konnte
                 if not current_ip and not current_ip6:
                     log("🔄 Aktiviere resilientes Netzwerkverhalten aufgrund von Fehlern...", "WARNING", "MAIN")
@@ -1515,12 +2289,12 @@ def main():
                 if ip_changed:
                     log(f"Current public IP: {current_ip}", "INFO", section="MAIN")
                 else:
-                    log(f"Current public IP: {current_ip}", "TRACE", section="MAIN")
+                    log_lazy("TRACE", "MAIN", "Current public IP: %s", current_ip)
             if current_ip6:
                 if ip6_changed:
                     log(f"Current public IPv6: {current_ip6}", "INFO", section="MAIN")
                 else:
-                    log(f"Current public IPv6: {current_ip6}", "TRACE", section="MAIN")
+                    log_lazy("TRACE", "MAIN", "Current public IPv6: %s", current_ip6)
                     
             # Perform updates if needed
             if ip_changed or ip6_changed or failed_providers or state.failed_providers:
@@ -1532,42 +2306,39 @@ def main():
                 # Update all providers (retry failed providers always)
                 retry_providers = failed_providers.copy()
                 failed_providers = []
-                state.failed_providers = []
+                state.failed_providers.clear()
                 
-                for provider in providers:
-                    # Retry if provider was in failed_providers or IP changed
-                    if provider in retry_providers or ip_changed or ip6_changed:
-                        try:
-                            result = update_provider(provider, current_ip, current_ip6)
-                            section = provider.get('name', 'PROVIDER').upper()
-                            if not result:  # update_provider returns True for success (updated/nochg), False for failure
-                                failed_providers.append(provider)
-                                state.add_failed_provider(provider.get('name', 'unknown'))
-                        except Exception as e:
-                            log(f"Provider update failed: {provider.get('name')} - {e}", "ERROR", "PROVIDER")
-                            failed_providers.append(provider)
-                            state.add_failed_provider(provider.get('name', 'unknown'))
+                # Retry if provider was in failed_providers or IP changed
+                due_providers = select_due_providers(providers, retry_providers, ip_changed or ip6_changed)
+                try:
+                    update_results = update_all_providers(due_providers, current_ip, current_ip6)
+                except Exception as e:
+                    log(f"Provider update failed: {e}", "ERROR", "PROVIDER")
+                    update_results = [(provider, False) for provider in due_providers]
+                for provider, result in update_results:
+                    if not result:  # update_provider returns True for success (updated/nochg), False for failure
+                        failed_providers.append(provider)
+                        state.add_failed_provider(provider.get('name', 'unknown'))
                             
-                # Save last known IPs
-                if current_ip:
+                # Save last known IPs (only changed ones - retries alone need no write)
+                if current_ip and current_ip != last_ip:
                     save_last_ip("v4", current_ip)
-                if current_ip6:
+                if current_ip6 and current_ip6 != last_ip6:
                     save_last_ip("v6", current_ip6)
                     
                 last_ip = current_ip
                 last_ip6 = current_ip6
                 # Update state
-                state.last_ipv4 = current_ip
-                state.last_ipv6 = current_ip6
-                elapsed = 0
-                log(f"Next run in {timer} seconds...", "DEBUG", section="MAIN")
+                state.update(last_ipv4=current_ip, last_ipv6=current_ip6)
+                timer_start = time.monotonic()
+                log_lazy("DEBUG", "MAIN", "Next run in %s seconds...", timer)
             else:
                 if current_ip:
-                    log(f"IP unchanged ({current_ip}), no update needed.", "TRACE", section="MAIN")
+                    log_lazy("TRACE", "MAIN", "IP unchanged (%s), no update needed.", current_ip)
                 if current_ip6:
-                    log(f"IPv6 unchanged ({current_ip6}), no update needed.", "TRACE", section="MAIN")
-                elapsed = 0
-                log(f"Next run in {timer} seconds...", "DEBUG", section="MAIN")
+                    log_lazy("TRACE", "MAIN", "IPv6 unchanged (%s), no update needed.", current_ip6)
+                timer_start = time.monotonic()
+                log_lazy("DEBUG", "MAIN", "Next run in %s seconds...", timer)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file